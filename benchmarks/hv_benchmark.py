@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  hv_benchmark.py
+#
+#  This script times the two and three objective hypervolume fast paths of
+#  hv.HyperVolume against the general dimension-sweep algorithm, and compares
+#  time and memory of the compact and the linked list representations used by
+#  the general algorithm.
+#
+#  Copyright 2015 Renzo Massobrio
+#  Facultad de Ingenieria, UdelaR
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append('../libs')
+import tabulatelib
+from hv import ArrayMultiList, HyperVolume
+
+# The general algorithm is only timed up to these front sizes, it takes
+# minutes beyond them.
+MAX_GENERAL_SIZE = {2: 100000, 3: 10000}
+
+# Front sizes used to compare both representations of the general algorithm.
+REPRESENTATION_SIZES = {4: [100, 300, 1000], 5: [100, 200, 400]}
+
+# Front size used to measure the memory taken by both representations.
+REPRESENTATION_MEMORY_SIZE = 100000
+
+def spherical_front(number_of_points, dimensions, seed=0):
+    """
+    Random non-dominated front on the positive part of the unit sphere.
+    """
+    rng = np.random.default_rng(seed)
+    points = np.abs(rng.standard_normal((number_of_points, dimensions)))
+    return points / np.linalg.norm(points, axis=1)[:, np.newaxis]
+
+def best_time(function, repetitions):
+    best = None
+    value = None
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        value = function()
+        elapsed = time.perf_counter() - start
+        if best == None or elapsed < best:
+            best = elapsed
+    return (best, value)
+
+def general_path(hyperVolume, front):
+    """
+    Runs the general dimension-sweep algorithm on front, bypassing the
+    dispatch in HyperVolume.compute.
+    """
+    referencePoint = np.asarray(hyperVolume.referencePoint)
+    return hyperVolume.hvGeneral(front - referencePoint)
+
+def peak_memory(function):
+    """
+    Runs function and returns the peak of the memory it allocated, in MB.
+    """
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+def build_list(hyperVolume, front):
+    """
+    Builds the linked lists the general algorithm works on for front.
+    """
+    if hyperVolume.compact:
+        return ArrayMultiList(len(hyperVolume.referencePoint), front)
+    hyperVolume.preProcess(front.tolist())
+    return hyperVolume.list
+
+def compare_representations():
+    """
+    Compares the general algorithm with the compact (ArrayMultiList) and the
+    linked (MultiList of Node objects) representations: the time it takes on
+    small fronts and the memory taken by the lists of a large front.
+    """
+    rows = []
+    for (dimensions, sizes) in sorted(REPRESENTATION_SIZES.items()):
+        for size in sizes:
+            front = spherical_front(size, dimensions)
+            row = [dimensions, size]
+            values = []
+            for compact in (True, False):
+                hyperVolume = HyperVolume([1.0] * dimensions, compact=compact)
+                (elapsed, value) = best_time(lambda: general_path(hyperVolume, front), 1)
+                row.append(elapsed)
+                values.append(value)
+            row.append(abs(values[0] - values[1]))
+            rows.append(row)
+
+    print(tabulatelib.tabulate(rows, headers=["m", "n", "compact (s)", "linked (s)", "|difference|"]))
+    print("")
+
+    rows = []
+    for dimensions in sorted(REPRESENTATION_SIZES):
+        front = spherical_front(REPRESENTATION_MEMORY_SIZE, dimensions)
+        row = [dimensions, REPRESENTATION_MEMORY_SIZE]
+        for compact in (True, False):
+            hyperVolume = HyperVolume([1.0] * dimensions, compact=compact)
+            row.append(peak_memory(lambda: build_list(hyperVolume, front)))
+        rows.append(row)
+
+    print(tabulatelib.tabulate(rows, headers=["m", "n", "compact lists (MB)", "linked lists (MB)"]))
+
+def main():
+    sizes = [100, 1000, 10000, 100000]
+    if len(sys.argv) > 1:
+        sizes = [int(arg) for arg in sys.argv[1:]]
+
+    rows = []
+    for dimensions in (2, 3):
+        hyperVolume = HyperVolume([1.0] * dimensions)
+        for size in sizes:
+            front = spherical_front(size, dimensions)
+            repetitions = 5 if size <= 1000 else 1
+            (fast_time, fast_hv) = best_time(lambda: hyperVolume.compute(front), repetitions)
+            if size <= MAX_GENERAL_SIZE[dimensions]:
+                (general_time, general_hv) = best_time(lambda: general_path(hyperVolume, front), repetitions)
+                speedup = general_time / fast_time
+                error = abs(fast_hv - general_hv)
+            else:
+                general_time = speedup = error = None
+            rows.append([dimensions, size, fast_time, general_time, speedup, error])
+
+    print(tabulatelib.tabulate(rows, headers=["m", "n", "fast (s)", "general (s)", "speedup", "|difference|"], missingval="-"))
+    print("")
+    compare_representations()
+    return 0
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  pf_benchmark.py
+#
+#  This script times the front filters, the metrics of metricslib and
+#  hv.HyperVolume on synthetic fronts of growing size and number of
+#  objectives, records the peak memory of every kernel and compares the
+#  results against a stored baseline to flag regressions.
+#
+#  Copyright 2015 Renzo Massobrio
+#  Facultad de Ingenieria, UdelaR
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append('../libs')
+import generic_pf_metrics
+import metricslib
+import nondominated
+import tabulatelib
+from hv import HyperVolume
+
+RESULTS_VERSION = 1
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000, 1000000]
+DEFAULT_OBJECTIVES = [2, 3, 4, 5, 6]
+
+# Relative slowdown (or memory growth) over the baseline that is reported as
+# a regression.
+DEFAULT_TOLERANCE = 0.25
+
+# Measurements below these values are too noisy to flag regressions on.
+MIN_SECONDS = 0.001
+MIN_PEAK_MB = 0.1
+
+# Fraction of the points of the "noisy" shape that are dominated.
+NOISE_FRACTION = 0.5
+
+# Number of bands of the "disconnected" shape, every other one is empty.
+DISCONNECTED_BANDS = 5
+
+def simplex_points(number_of_points, dimensions, rng):
+    """
+    Random points on the unit simplex (the coordinates add up to one).
+    """
+    return rng.dirichlet(np.ones(dimensions), number_of_points)
+
+def linear_front(number_of_points, dimensions, rng):
+    return simplex_points(number_of_points, dimensions, rng)
+
+def convex_front(number_of_points, dimensions, rng):
+    # the square roots of the coordinates add up to one
+    return simplex_points(number_of_points, dimensions, rng) ** 2
+
+def concave_front(number_of_points, dimensions, rng):
+    # positive part of the unit sphere
+    points = simplex_points(number_of_points, dimensions, rng)
+    return points / np.linalg.norm(points, axis=1)[:, np.newaxis]
+
+def disconnected_front(number_of_points, dimensions, rng):
+    """
+    Linear front split in pieces: the points whose first objective falls in
+    every other band of DISCONNECTED_BANDS are removed.
+    """
+    pieces = []
+    remaining = number_of_points
+    while remaining > 0:
+        points = simplex_points(2 * remaining + 1, dimensions, rng)
+        points = points[np.floor(points[:, 0] * DISCONNECTED_BANDS) % 2 == 0][:remaining]
+        pieces.append(points)
+        remaining -= len(points)
+    return np.concatenate(pieces)
+
+def noisy_front(number_of_points, dimensions, rng):
+    """
+    Linear front in which NOISE_FRACTION of the points are moved away from
+    it, so they are dominated.
+    """
+    points = simplex_points(number_of_points, dimensions, rng)
+    dominated = rng.random(number_of_points) < NOISE_FRACTION
+    points[dominated] += rng.random((int(dominated.sum()), dimensions)) * 0.5 + 0.01
+    return points
+
+SHAPES = {
+    "linear": linear_front,
+    "convex": convex_front,
+    "concave": concave_front,
+    "disconnected": disconnected_front,
+    "noisy": noisy_front,
+}
+
+def synthetic_front(shape, number_of_points, dimensions, seed=0):
+    """
+    Returns an (n, m) array with a front of the given shape, the same for
+    the same arguments.
+    """
+    if shape not in SHAPES:
+        raise Exception("ERROR: unknown shape {0}, it must be one of {1}".format(shape, ", ".join(sorted(SHAPES))))
+    return SHAPES[shape](number_of_points, dimensions, np.random.default_rng(seed))
+
+def columns(points):
+    return tuple(points[:, j] for j in range(points.shape[1]))
+
+# Every kernel takes the benchmarked front and a reference front of the same
+# shape, both (n, m) arrays. The 2-D kernels use the (X, Y) arguments of
+# metricslib.
+KERNELS = {
+    "pareto_frontier": lambda front, reference: metricslib.pareto_frontier(front[:, 0], front[:, 1]),
+    "nondominated": lambda front, reference: nondominated.nondominated(front),
+    "normalize_front": lambda front, reference: metricslib.normalize_front(columns(reference), columns(front)),
+    "generational_distance": lambda front, reference: metricslib.generational_distance(front[:, 0], front[:, 1], columns(reference)),
+    "spacing": lambda front, reference: metricslib.spacing(front[:, 0], front[:, 1]),
+    "spread": lambda front, reference: metricslib.spread(front[:, 0], front[:, 1], columns(reference)),
+    "hypervolume": lambda front, reference: HyperVolume([1.0] * front.shape[1]).compute(front),
+}
+
+# Objectives the kernels accept. The kernels that are not listed accept any
+# number of objectives.
+KERNEL_OBJECTIVES = {
+    "pareto_frontier": [2],
+    "generational_distance": [2],
+    "spacing": [2],
+    "spread": [2],
+}
+
+# The kernels are only run up to these front sizes for the given number of
+# objectives, they take minutes beyond them. The hypervolume of four or more
+# objectives uses the general dimension-sweep algorithm.
+MAX_SIZE = {
+    ("nondominated", 4): 100000,
+    ("nondominated", 5): 100000,
+    ("nondominated", 6): 100000,
+    ("hypervolume", 4): 300,
+    ("hypervolume", 5): 100,
+    ("hypervolume", 6): 100,
+}
+
+def supports(kernel, size, dimensions):
+    if dimensions not in KERNEL_OBJECTIVES.get(kernel, [dimensions]):
+        return False
+    return size <= MAX_SIZE.get((kernel, dimensions), size)
+
+def best_time(function, repetitions):
+    best = None
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best == None or elapsed < best:
+            best = elapsed
+    return best
+
+def peak_memory(function):
+    """
+    Runs function and returns the peak of the memory it allocated, in MB.
+    """
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+def run_benchmarks(kernels, shapes, sizes, objectives, repetitions):
+    """
+    Times every kernel on every front and returns the list of results. The
+    peak memory is measured in a separate run, tracemalloc slows the kernels
+    down.
+    """
+    results = []
+    for dimensions in objectives:
+        for size in sizes:
+            selected = [kernel for kernel in kernels if supports(kernel, size, dimensions)]
+            if len(selected) == 0:
+                continue
+            for shape in shapes:
+                front = synthetic_front(shape, size, dimensions, seed=0)
+                reference = synthetic_front(shape, size, dimensions, seed=1)
+                for kernel in selected:
+                    function = lambda: KERNELS[kernel](front, reference)
+                    seconds = best_time(function, repetitions if size <= 10000 else 1)
+                    results.append({"kernel": kernel, "shape": shape, "n": size, "m": dimensions,
+                                    "seconds": seconds, "peak_mb": peak_memory(function)})
+                    print("{0:>22} {1:>12} n={2:<8} m={3}  {4:.6f} s".format(kernel, shape, size, dimensions, seconds), file=sys.stderr)
+    return results
+
+def result_key(result):
+    return (result["kernel"], result["shape"], result["n"], result["m"])
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    Returns the table rows comparing results with the ones of baseline
+    (loaded from a results file) and the number of regressions: results
+    that are more than tolerance slower, or use more than tolerance more
+    memory, than the baseline.
+    """
+    previous = dict((result_key(result), result) for result in baseline["results"])
+    rows = []
+    regressions = 0
+    for result in results:
+        old = previous.get(result_key(result))
+        if old == None:
+            rows.append(list(result_key(result)) + [result["seconds"], None, None, result["peak_mb"], None, None])
+            continue
+        time_ratio = result["seconds"] / old["seconds"] if old["seconds"] > 0 else None
+        memory_ratio = result["peak_mb"] / old["peak_mb"] if old["peak_mb"] > 0 else None
+        flags = []
+        if time_ratio != None and result["seconds"] >= MIN_SECONDS and time_ratio > 1 + tolerance:
+            flags.append("time")
+        if memory_ratio != None and result["peak_mb"] >= MIN_PEAK_MB and memory_ratio > 1 + tolerance:
+            flags.append("memory")
+        if len(flags) > 0:
+            regressions += 1
+        rows.append(list(result_key(result)) + [result["seconds"], time_ratio, result["peak_mb"], memory_ratio,
+                                                "REGRESSION ({0})".format(", ".join(flags)) if flags else None])
+    return (rows, regressions)
+
+def parse_list(value, choices=None, convert=str):
+    values = [convert(v) for v in value.split(",") if v != ""]
+    if choices != None:
+        for v in values:
+            if v not in choices:
+                print("Error. Invalid value {0}. It must be one of {1}.".format(v, ", ".join(sorted(choices))))
+                exit(-1)
+    return values
+
+def main():
+    (argv, options) = generic_pf_metrics.parse_options(sys.argv, {"sizes": True, "objectives": True, "shapes": True, "kernels": True,
+                                                                  "repeat": True, "output": True, "baseline": True, "tolerance": True})
+    if len(argv) != 1:
+        print("Usage:")
+        print(" - python {0} [--sizes N,N,...] [--objectives M,M,...] [--shapes S,S,...] [--kernels K,K,...] [--repeat R] [--output FILE] [--baseline FILE] [--tolerance T]".format(argv[0]))
+        exit(-1)
+
+    sizes = parse_list(options.get("sizes", ""), convert=int) or DEFAULT_SIZES
+    objectives = parse_list(options.get("objectives", ""), convert=int) or DEFAULT_OBJECTIVES
+    shapes = parse_list(options.get("shapes", ""), SHAPES) or sorted(SHAPES)
+    kernels = parse_list(options.get("kernels", ""), KERNELS) or list(KERNELS)
+    repetitions = int(options.get("repeat", 3))
+    tolerance = float(options.get("tolerance", DEFAULT_TOLERANCE))
+
+    baseline = None
+    if "baseline" in options:
+        try:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print("Error. Can not read the baseline {0}: {1}".format(options["baseline"], e))
+            exit(-1)
+        if baseline.get("version") != RESULTS_VERSION:
+            print("Error. Unsupported baseline version {0}.".format(baseline.get("version")))
+            exit(-1)
+
+    results = run_benchmarks(kernels, shapes, sizes, objectives, repetitions)
+
+    if "output" in options:
+        with open(options["output"], "w") as f:
+            json.dump({"version": RESULTS_VERSION, "python": platform.python_version(), "numpy": np.__version__,
+                       "machine": platform.platform(), "results": results}, f, indent=1)
+
+    if baseline == None:
+        rows = [list(result_key(result)) + [result["seconds"], result["peak_mb"]] for result in results]
+        print(tabulatelib.tabulate(rows, headers=["kernel", "shape", "n", "m", "time (s)", "peak (MB)"]))
+        return 0
+
+    (rows, regressions) = compare_with_baseline(results, baseline, tolerance)
+    print(tabulatelib.tabulate(rows, headers=["kernel", "shape", "n", "m", "time (s)", "time ratio", "peak (MB)", "peak ratio", ""], missingval="-"))
+    print("")
+    print("{0} regression(s) over a tolerance of {1:.0%}".format(regressions, tolerance))
+    return 1 if regressions > 0 else 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,107 @@
+# Copyright 2015 Renzo Massobrio
+# Facultad de Ingenieria, UdelaR
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+############################################################################################################################
+# INSTRUCTIONS
+# 
+# Script to compare several algorithms on the same problem. The runs of all the algorithms are evaluated against one global
+# Pareto front, so the metrics of the different algorithms can be compared, and a single table with the mean and standard
+# deviation of every metric for every algorithm is printed. The results can be pareto fronts output from ECJ
+# (http://cs.gmu.edu/~eclab/projects/ecj/) or jMetal (http://jmetal.sourceforge.net/), mixed in the same comparison.
+# 
+# USAGE:
+# python pf_compare.py <normalize> <algorithm_1> <algorithm_2> ...
+# 
+# To run the example: 
+# python pf_compare.py 1 five=jmetal:../jmetal/example:5 three=jmetal:../jmetal/example:3
+# 
+# Notes:
+# 	-<algorithm_J> is [name=]<framework>:<path_to_results>:<number_of_runs>, where <framework> is ecj (files "job.*.front.stat")
+# 	 or jmetal (files "FUN.*") and name is the label of the algorithm in the table (default: <path_to_results>)
+# 	-[--reference FILE] evaluates the runs against the pareto front in FILE instead of the global front of all the algorithms
+# 	-[--jobs N] evaluates the metrics of the runs of all the algorithms in N parallel processes (default: 1)
+# 	-[--format FMT] is the tabulate format of the table: simple, plain, grid, pipe, orgtbl, rst, mediawiki or latex (default: simple)
+# 	-[--no-cache], [--clear-cache] and [--cache-dir DIR] control the cache of parsed fronts as in pf_metrics.py. The cached
+# 	 global front is kept with the results of the first algorithm (or next to the reference file)
+# 	-[--profile], [--profile-json FILE], [--profile-cprofile FILE] and [--profile-no-memory] profile the stages as in pf_metrics.py
+# 
+# IMPORTANT: THIS SCRIPT ASSUMES MINIMIZATION OF BOTH OBJECTIVES. YOU SHOULD MODIFY THESE BEHAVIOUR TO FIT YOUR NEEDS.
+# 
+# Please feel free to contact me at: renzom@fing.edu.uy
+# 
+############################################################################################################################
+
+import sys
+
+sys.path.append('../libs')
+import frontio
+import frontset
+import generic_pf_metrics
+
+NUM_OBJECTIVES = 2
+
+def parse_algorithm(argument):
+    """
+    Returns the (name, framework, path_to_results, number_of_runs) of an
+    [name=]<framework>:<path_to_results>:<number_of_runs> argument. The name
+    ends at the first "=" that comes before any ":", so the path may hold
+    "=" characters.
+    """
+    (name, separator, spec) = argument.partition("=")
+    if separator == "" or ":" in name:
+        (name, spec) = ("", argument)
+    parts = spec.split(":")
+    if len(parts) < 3 or parts[0] not in frontio.RESULT_FILE_NAMES or not parts[-1].isdigit():
+        print("Error. Invalid algorithm {0}. It must be [name=]<ecj|jmetal>:<path_to_results>:<number_of_runs>.".format(argument))
+        exit(-1)
+    framework = parts[0]
+    path_to_results = ":".join(parts[1:-1])
+    number_of_runs = int(parts[-1])
+    if name == "":
+        name = path_to_results
+    return (name, framework, path_to_results, number_of_runs)
+
+####################################
+########## MAIN ####################
+
+def main():
+    (argv, options) = generic_pf_metrics.parse_options(sys.argv, dict(generic_pf_metrics.CACHE_OPTIONS, jobs=True, reference=True, format=True, **generic_pf_metrics.PROFILE_OPTIONS))
+    jobs = int(options.get("jobs", 1))
+    ref_pf_file = options.get("reference")
+    profiler = generic_pf_metrics.start_profiling(options)
+
+    if len(argv) < 3:
+        print("Not enough parameters. Usage:")
+        print(" - python {0} [--reference FILE] [--jobs N] [--format FMT] [--no-cache] [--clear-cache] [--cache-dir DIR] [--profile] [--profile-json FILE] [--profile-cprofile FILE] [--profile-no-memory] <normalize> [name=]<ecj|jmetal>:<path_to_results>:<number_of_runs> ...".format(argv[0]))
+        exit(-1)
+
+    normalize = argv[1].strip().lower()
+    algorithms = [parse_algorithm(argument) for argument in argv[2:]]
+
+    #Load the pareto fronts of every algorithm
+    cache = generic_pf_metrics.front_cache(options, [algorithm[2] for algorithm in algorithms])
+    names = []
+    frontsets = []
+    for (name, framework, path_to_results, number_of_runs) in algorithms:
+        names.append(name)
+        frontsets.append(frontset.load_fronts(frontio.result_files(framework, path_to_results, number_of_runs), NUM_OBJECTIVES, cache))
+
+    generic_pf_metrics.compare(names, frontsets, ref_pf_file, normalize, jobs, cache, algorithms[0][2], options.get("format", "simple"))
+    generic_pf_metrics.finish_profiling(options, profiler)
+
+if __name__ == "__main__":
+    main()
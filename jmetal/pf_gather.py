@@ -29,46 +29,62 @@ import sys
 from os import path
 
 sys.path.append('../libs')
+import frontio
+import frontset
+import frontstore
 import generic_pf_metrics
+import globalfront
+import streamgather
 
-def load_jmetal_results(path_to_results, num_objectives, num_runs):
-    results = []
-    
-    for no in range(num_objectives):
-        results.append([])
-    
-    for run in range(num_runs):
-        path_to_file = path.join(path_to_results, "FUN.{0}".format(run))
-
-        with open(path_to_file) as f:
-            lines = f.readlines()
-            
-            for line in lines:
-                tokens = line.split()
-
-                for no in range(num_objectives):
-                    results[no].append(float(tokens[no]))
-
-    return results
+def load_jmetal_results(path_to_results, num_objectives, num_runs, cache=None):
+    return frontset.load_fronts(frontio.result_files("jmetal", path_to_results, num_runs), num_objectives, cache)
 
 def main():
-    if len(sys.argv) < 4:
+    (argv, options) = generic_pf_metrics.parse_options(sys.argv, {**generic_pf_metrics.CACHE_OPTIONS, "store": True, "update": True, "max-memory": True})
+
+    if len(argv) < 4:
         print("This script loads a set of jMetal solutions from different experiments and computes the aggregated Pareto front.")
-        print("Not enough arguments. Usage: {0} <num runs> <num obj> <result path 1> <result path 2> <result path 3> ...".format(sys.argv[0]))
+        print("Not enough arguments. Usage: {0} [--no-cache] [--clear-cache] [--cache-dir DIR] [--store PATH | --update FILE | --max-memory SIZE] <num runs> <num obj> <result path 1> <result path 2> <result path 3> ...".format(argv[0]))
         exit(-1)   
 
-    num_runs = int(sys.argv[1])
-    num_objectives = int(sys.argv[2])
+    num_runs = int(argv[1])
+    num_objectives = int(argv[2])
+    cache = generic_pf_metrics.front_cache(options, argv[3:])
     
-    points = []
-    for no in range(num_objectives):
-        points.append([])
+    if len([o for o in ("store", "update", "max-memory") if o in options]) > 1:
+        print("Error. Only one of the options --store, --update and --max-memory can be used.")
+        exit(-1)
+
+    if "max-memory" in options:
+        #Stream the result files in chunks, spilling partial fronts to temporary files
+        max_memory = generic_pf_metrics.parse_memory_size(options["max-memory"])
+        paths_to_files = [f for p in range(3, len(argv)) for f in frontio.result_files("jmetal", argv[p], num_runs)]
+        for block in streamgather.gather(paths_to_files, num_objectives, max_memory):
+            generic_pf_metrics.print_points(block)
+        return 0
 
-    for p in range(3, len(sys.argv)):
-        aux_points = load_jmetal_results(sys.argv[p], num_objectives, num_runs)
+    if "update" in options:
+        #Fold only the new runs into the saved global front and print it
+        if path.exists(options["update"]):
+            global_front = globalfront.GlobalFront.load(options["update"])
+            if global_front.num_objectives != num_objectives:
+                print("Error. {0} holds a front of {1} objectives.".format(options["update"], global_front.num_objectives))
+                exit(-1)
+        else:
+            global_front = globalfront.GlobalFront(num_objectives)
+        paths_to_files = [f for p in range(3, len(argv)) for f in frontio.result_files("jmetal", argv[p], num_runs)]
+        if global_front.update(paths_to_files, cache) > 0:
+            global_front.save(options["update"])
+        generic_pf_metrics.print_points(global_front.points)
+        return 0
 
-        for no in range(num_objectives):
-            points[no] = points[no] + aux_points[no]
+    if "store" in options:
+        #Reduce the runs of the store one at a time instead of loading all the points
+        paths_to_files = [f for p in range(3, len(argv)) for f in frontio.result_files("jmetal", argv[p], num_runs)]
+        store = frontstore.load_or_build(options["store"], paths_to_files, num_objectives, cache)
+        points = store.runs()
+    else:
+        points = frontset.FrontSet.concatenate([load_jmetal_results(argv[p], num_objectives, num_runs, cache) for p in range(3, len(argv))]).points
 
     generic_pf_metrics.print_non_dominated(points)
         
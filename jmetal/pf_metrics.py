@@ -18,7 +18,8 @@
 ############################################################################################################################
 # INSTRUCTIONS
 # 
-# Script to plot the global Pareto front and calculate generational distance, spread, spacing and relative hypervolume based
+# Script to plot the global Pareto front and calculate generational distance, spread, spacing, relative hypervolume, IGD, IGD+
+# and the additive and multiplicative epsilon indicators based
 # on the pareto fronts output from jMetal (http://jmetal.sourceforge.net/).
 # 
 # USAGE:
@@ -31,11 +32,29 @@
 # 	-<path_to_results> is the folder where the files "FUN.*" are located
 # 	-<number_of_runs> is the amount of jobs executed. e.g.: if number_of_runs is 4 you should have FUN.0,...,FUN.3
 # 	-<objective_J_name> is the label for the axis corresponding to objective J in the plot
+# 	-[--jobs N] evaluates the metrics of the runs in N parallel processes (default: 1)
+# 	-[--no-cache] parses the result files without using the cache of parsed fronts (by default kept in <path_to_results>/.pf_cache)
+# 	 and computes the global front again instead of using its cached copy (kept next to the reference pf file when one is given)
+# 	-[--clear-cache] removes the cached fronts before loading the result files
+# 	-[--cache-dir DIR] keeps the cached fronts in DIR instead of <path_to_results>/.pf_cache
+# 	-[--float32] keeps the loaded fronts in single precision to halve their memory (it can not be used with --store)
+# 	-[--store PATH] reads the runs through memory maps of a binary front store kept in the folder PATH, which is (re)built when it is missing or the result files changed
+# 	-[--no-plot] only computes the metrics, without plotting the fronts (matplotlib is not even loaded)
+# 	-[--plot-runs] also plots every run over the global front, in RunPF.<run>.png files next to GlobalPF.png, using the --jobs processes
+# 	-[--output FILE] also writes the metrics of every run and their statistics to FILE, "-" for the standard output (then the
+# 	 report is not printed and the profile goes to the standard error). The format is the extension of FILE (json, csv or npz) or a text table
+# 	-[--output-format FMT] is the format of --output: json, csv (one row per run, then one per statistic), npz or table
+# 	-[--profile] prints the wall time, CPU time and peak memory (tracemalloc) of every stage: loading, global front, plot and each metric
+# 	-[--profile-json FILE] also writes the measures of every stage and run to FILE as JSON (implies --profile)
+# 	-[--profile-cprofile FILE] also writes cProfile statistics of the whole script to FILE, to be read with pstats (implies --profile)
+# 	-[--profile-no-memory] does not trace the memory while profiling, tracing slows the stages down (implies --profile)
 # 
 # IMPORTANT: THIS SCRIPT ASSUMES MINIMIZATION OF BOTH OBJECTIVES. YOU SHOULD MODIFY THESE BEHAVIOUR TO FIT YOUR NEEDS.
 # 
 # The metrics are calculated using the formulas in "Multiobjective optimization using Evolutionary Algorithms" from Kalyanmoy Deb.
 # For the spread calculation, the euclidean distance is used.
+# IGD and IGD+ average the distances from the points of the global Pareto front to the front of each run. The multiplicative
+# epsilon indicator is computed on the values before normalization and is only defined when all the values are positive.
 #
 # Hypervolumes are calculated using the code of Simon Wessing from TU Dortmund University found at:
 #    https://ls11-www.cs.uni-dortmund.de/rudolph/hypervolume/start
@@ -47,31 +66,18 @@
 import sys
 from os import path
 
+import numpy as np
+
 sys.path.append('../libs')
 
+import frontio
+import frontset
+import frontstore
 import generic_pf_metrics
 
-def load_jmetal_results(path_to_results, objectives, number_of_runs):
-    #Initialize dictionary to parse the pareto fronts
-    results = []
-    
-    for run in range (0,number_of_runs):
-        results.append([])
-
-        for no in range(len(objectives)):
-            results[run].append([])
-    
-    for run in range(0,number_of_runs):
-        path_to_file = path.join(path_to_results, "FUN.{0}".format(run))
-
-        with open(path_to_file) as f:
-            for line in f:
-                tokens = line.split()
-
-                for no in range(len(objectives)):
-                    results[run][no].append(float(tokens[no]))
-
-    return results
+def load_jmetal_results(path_to_results, objectives, number_of_runs, cache=None, dtype=np.float64):
+    #Parse the pareto fronts, results[run][objective] holds the values of the objective in the run
+    return frontset.load_fronts(frontio.result_files("jmetal", path_to_results, number_of_runs), len(objectives), cache, dtype)
 
 ####################################
 ########## MAIN ####################
@@ -79,29 +85,49 @@ def load_jmetal_results(path_to_results, objectives, number_of_runs):
 def main():
     ref_pf_file = None
     normalize = None
+
+    (argv, options) = generic_pf_metrics.parse_options(sys.argv, dict(generic_pf_metrics.CACHE_OPTIONS, jobs=True, store=True, float32=False, **generic_pf_metrics.PLOT_OPTIONS, **generic_pf_metrics.OUTPUT_OPTIONS, **generic_pf_metrics.PROFILE_OPTIONS))
+    jobs = int(options.get("jobs", 1))
+    report = generic_pf_metrics.output_report(options)
+    profiler = generic_pf_metrics.start_profiling(options)
+
+    if "float32" in options and "store" in options:
+        print("Error. The option --float32 can not be used with --store, the front store is kept in double precision.")
+        exit(-1)
     
-    if len(sys.argv) != 6 and len(sys.argv) != 7:
+    if len(argv) != 6 and len(argv) != 7:
         print("Not enough parameters. Usage:")
-        print(" - python {0} <path_to_results> <number_of_runs> <normalize> <obj1_name> <obj2_name>".format(sys.argv[0]))
-        print(" - python {0} <reference pf> <path_to_results> <number_of_runs> <normalize> <obj1_name> <obj2_name>".format(sys.argv[0]))
+        print(" - python {0} [--jobs N] [--no-cache] [--clear-cache] [--cache-dir DIR] [--float32] [--store PATH] [--no-plot] [--plot-runs] [--output FILE] [--output-format FMT] [--profile] [--profile-json FILE] [--profile-cprofile FILE] [--profile-no-memory] <path_to_results> <number_of_runs> <normalize> <obj1_name> <obj2_name>".format(argv[0]))
+        print(" - python {0} [--jobs N] [--no-cache] [--clear-cache] [--cache-dir DIR] [--float32] [--store PATH] [--no-plot] [--plot-runs] [--output FILE] [--output-format FMT] [--profile] [--profile-json FILE] [--profile-cprofile FILE] [--profile-no-memory] <reference pf> <path_to_results> <number_of_runs> <normalize> <obj1_name> <obj2_name>".format(argv[0]))
         exit(-1)
     else:
-        if len(sys.argv) == 6:
-            path_to_results = sys.argv[1]
-            number_of_runs = int(sys.argv[2])
-            normalize = sys.argv[3].strip().lower()           
-            objectives = [sys.argv[4], sys.argv[5]]
+        if len(argv) == 6:
+            path_to_results = argv[1]
+            number_of_runs = int(argv[2])
+            normalize = argv[3].strip().lower()           
+            objectives = [argv[4], argv[5]]
         else:
-            ref_pf_file = sys.argv[1]
-            path_to_results = sys.argv[2]
-            number_of_runs = int(sys.argv[3])
-            normalize = sys.argv[4].strip().lower()
-            objectives = [sys.argv[5], sys.argv[6]]
+            ref_pf_file = argv[1]
+            path_to_results = argv[2]
+            number_of_runs = int(argv[3])
+            normalize = argv[4].strip().lower()
+            objectives = [argv[5], argv[6]]
                 
     #Load the pareto fronts from the files
-    results = load_jmetal_results(path_to_results, objectives, number_of_runs)
+    cache_folders = [path_to_results] if ref_pf_file == None else [path_to_results, path.dirname(path.abspath(ref_pf_file))]
+    cache = generic_pf_metrics.front_cache(options, cache_folders)
+    store = None
+    if "store" in options:
+        store = frontstore.load_or_build(options["store"], frontio.result_files("jmetal", path_to_results, number_of_runs), len(objectives), cache)
+        results = store.frontset()
+    else:
+        dtype = np.float32 if "float32" in options else np.float64
+        results = load_jmetal_results(path_to_results, objectives, number_of_runs, cache, dtype)
 
-    generic_pf_metrics.compute(ref_pf_file, path_to_results, number_of_runs, objectives, results, normalize)
+    result = generic_pf_metrics.compute(ref_pf_file, path_to_results, number_of_runs, objectives, results, normalize, jobs, store, cache,
+                                        "no-plot" not in options, "plot-runs" in options, report)
+    generic_pf_metrics.write_output(options, result)
+    generic_pf_metrics.finish_profiling(options, profiler)
 
 if __name__ == "__main__":
     main()
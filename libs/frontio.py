@@ -0,0 +1,204 @@
+# Copyright 2015 Renzo Massobrio
+# Facultad de Ingenieria, UdelaR
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Loading of the front files written by ECJ (job.N.front.stat) and jMetal
+(FUN.N): one point per line, objective values separated by whitespace.
+
+Parsed fronts can be kept in a FrontCache, so that later loads of an
+unchanged file memory-map a binary .npy copy instead of parsing the text.
+"""
+
+import glob
+import hashlib
+import itertools
+import os
+import re
+import tempfile
+import warnings
+from os import path
+
+import numpy as np
+
+# Name of the cache folder created next to the result files
+CACHE_DIRECTORY_NAME = ".pf_cache"
+
+# Name of a cache entry: <file name>.<path key>.<file key>.npy
+ENTRY_KEYS_PATTERN = re.compile(r"\.[0-9a-f]{16}\.npy$")
+
+# Name of the front file of run N written by every supported framework
+RESULT_FILE_NAMES = {"ecj": "job.{0}.front.stat", "jmetal": "FUN.{0}"}
+
+def result_files(framework, path_to_results, number_of_runs):
+    """
+    Returns the paths of the front files of the first number_of_runs runs of
+    framework ("ecj" or "jmetal") in path_to_results.
+    """
+    if framework not in RESULT_FILE_NAMES:
+        raise Exception("ERROR: unknown framework {0}, it must be one of {1}".format(framework, ", ".join(sorted(RESULT_FILE_NAMES))))
+    return [path.join(path_to_results, RESULT_FILE_NAMES[framework].format(run)) for run in range(number_of_runs)]
+
+class FrontCache:
+    """
+    On-disk cache of parsed front files.
+
+    Every file is cached as an .npy file whose name is derived from the path,
+    size and modification time of the text file, so an entry is used only
+    while the file is unchanged. Entries are written to a .pf_cache folder
+    next to the result files, or to directory when given.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+
+    def directory_for(self, path_to_folder):
+        """
+        Returns the cache folder of the files in path_to_folder.
+        """
+        if self.directory != None:
+            return self.directory
+        return path.join(path.abspath(path_to_folder), CACHE_DIRECTORY_NAME)
+
+    def cache_directory(self, path_to_file):
+        return self.directory_for(path.dirname(path.abspath(path_to_file)))
+
+    def entry_prefix(self, path_to_file):
+        """
+        Returns the path of the cache entries of path_to_file without their
+        file key: they only differ in the size and modification time.
+        """
+        absolute_path = path.abspath(path_to_file)
+        path_key = hashlib.sha1(absolute_path.encode("utf-8")).hexdigest()[:16]
+        return path.join(self.cache_directory(path_to_file), "{0}.{1}.".format(path.basename(absolute_path), path_key))
+
+    def entries(self, path_to_file):
+        """
+        Returns the paths of the cache entries of path_to_file.
+        """
+        prefix = self.entry_prefix(path_to_file)
+        return [entry for entry in glob.glob(glob.escape(prefix) + "*.npy") if ENTRY_KEYS_PATTERN.fullmatch(entry[len(prefix) - 1:])]
+
+    def load(self, path_to_file):
+        """
+        Returns the parsed front of path_to_file with all its columns,
+        memory-mapped from the cache when there is a valid entry.
+        """
+        info = os.stat(path.abspath(path_to_file))
+        file_key = hashlib.sha1("{0}:{1}".format(info.st_size, info.st_mtime_ns).encode("utf-8")).hexdigest()[:16]
+        entry = self.entry_prefix(path_to_file) + file_key + ".npy"
+
+        if path.exists(entry):
+            try:
+                return np.load(entry, mmap_mode="r")
+            except ValueError:
+                # empty fronts can not be memory-mapped
+                return np.load(entry)
+
+        front = parse_front(path_to_file)
+        try:
+            os.makedirs(path.dirname(entry), exist_ok=True)
+            for stale in self.entries(path_to_file):
+                os.remove(stale)
+            (handle, temporary) = tempfile.mkstemp(dir=path.dirname(entry), suffix=".tmp")
+            with os.fdopen(handle, "wb") as f:
+                np.save(f, front)
+            os.replace(temporary, entry)
+        except OSError:
+            # the cache is only an optimization, e.g. the folder may be read-only
+            pass
+        return front
+
+    def clear(self, path_to_results):
+        """
+        Removes the cache entries of the files in path_to_results. Nothing
+        else in the cache folder is touched, it may be a folder of the user;
+        only the .pf_cache folder is removed, once it is empty.
+        """
+        try:
+            names = os.listdir(path_to_results)
+        except OSError:
+            names = []
+        for name in names:
+            for entry in self.entries(path.join(path_to_results, name)):
+                try:
+                    os.remove(entry)
+                except OSError:
+                    pass
+        if self.directory == None:
+            try:
+                os.rmdir(self.directory_for(path_to_results))
+            except OSError:
+                # missing, or it holds other files
+                pass
+
+def parse_front(path_to_file):
+    """
+    Parses a front file into a float64 (n, columns) array.
+
+    The whole file is parsed in bulk by NumPy's C reader, which accepts
+    jMetal's E-notation and trailing whitespace. Every line must have the
+    same number of columns.
+    """
+    try:
+        with warnings.catch_warnings():
+            # an empty file is a valid empty front
+            warnings.simplefilter("ignore", UserWarning)
+            return np.loadtxt(path_to_file, dtype=np.float64, ndmin=2)
+    except ValueError as e:
+        raise Exception("ERROR: {0}: {1}".format(path_to_file, e))
+
+def load_front(path_to_file, num_objectives, cache=None):
+    """
+    Loads a front file into a float64 (n, num_objectives) array, through
+    cache (a FrontCache) when given.
+
+    Every line must have at least num_objectives columns, extra columns are
+    ignored.
+    """
+    if cache != None:
+        front = cache.load(path_to_file)
+    else:
+        front = parse_front(path_to_file)
+
+    if front.size == 0:
+        return np.empty((0, num_objectives))
+    if front.shape[1] < num_objectives:
+        raise Exception("ERROR: {0}: expected {1} objectives but found {2} columns".format(path_to_file, num_objectives, front.shape[1]))
+    return np.ascontiguousarray(front[:, :num_objectives])
+
+def read_front_chunks(path_to_file, num_objectives, chunk_rows):
+    """
+    Parses a front file in pieces of at most chunk_rows lines, yielding a
+    float64 (n, num_objectives) array for each piece, so that files larger
+    than memory can be read.
+    """
+    with open(path_to_file) as f:
+        while True:
+            lines = list(itertools.islice(f, chunk_rows))
+            if len(lines) == 0:
+                return
+            try:
+                with warnings.catch_warnings():
+                    # a piece of blank lines is a valid empty piece
+                    warnings.simplefilter("ignore", UserWarning)
+                    chunk = np.loadtxt(lines, dtype=np.float64, ndmin=2)
+            except ValueError as e:
+                raise Exception("ERROR: {0}: {1}".format(path_to_file, e))
+            if chunk.size == 0:
+                continue
+            if chunk.shape[1] < num_objectives:
+                raise Exception("ERROR: {0}: expected {1} objectives but found {2} columns".format(path_to_file, num_objectives, chunk.shape[1]))
+            yield np.ascontiguousarray(chunk[:, :num_objectives])
@@ -0,0 +1,129 @@
+# Copyright 2015 Renzo Massobrio
+# Facultad de Ingenieria, UdelaR
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+The fronts of a set of runs stored in one contiguous array.
+
+A FrontSet keeps the points of all the runs one after the other in an
+(N, m) array and the offsets of every run in it, so run r is
+points[offsets[r]:offsets[r + 1]]. Runs are handed out as views, and
+reductions over all the runs are single NumPy calls on the whole array.
+
+For compatibility with the code that indexes results[run][objective],
+frontset[run] is the (m, n) transposed view of the run.
+"""
+
+import numpy as np
+
+import frontio
+import profiling
+
+class FrontSet:
+    """
+    Ragged collection of fronts: points holds the rows of all the runs and
+    offsets (of length number of runs + 1) where every run starts and ends.
+    """
+
+    def __init__(self, points, offsets):
+        self.points = points
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if self.offsets[0] != 0 or self.offsets[-1] != len(points) or (np.diff(self.offsets) < 0).any():
+            raise Exception("ERROR: the offsets do not match the points of the front set")
+
+    @staticmethod
+    def from_fronts(fronts, num_objectives=None, dtype=np.float64):
+        """
+        Copies a list of (n, m) arrays into a new FrontSet with values of
+        type dtype (float64, or float32 to halve the memory).
+        """
+        if num_objectives == None:
+            num_objectives = fronts[0].shape[1] if len(fronts) > 0 else 0
+        offsets = np.zeros(len(fronts) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(front) for front in fronts])
+        points = np.empty((offsets[-1], num_objectives), dtype=dtype)
+        for (run, front) in enumerate(fronts):
+            points[offsets[run]:offsets[run + 1]] = front
+        return FrontSet(points, offsets)
+
+    @staticmethod
+    def concatenate(frontsets):
+        """
+        Returns a FrontSet with the runs of all the given front sets, in
+        order.
+        """
+        points = np.concatenate([frontset.points for frontset in frontsets])
+        offsets = [0]
+        for frontset in frontsets:
+            offsets.extend((frontset.offsets[1:] + offsets[-1]).tolist())
+        return FrontSet(points, offsets)
+
+    @property
+    def number_of_runs(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_objectives(self):
+        return self.points.shape[1]
+
+    def __len__(self):
+        return self.number_of_runs
+
+    def __getitem__(self, run):
+        return self.run(run).T
+
+    def run(self, run):
+        """
+        Returns the (n, m) view of the points of run.
+        """
+        return self.points[self.offsets[run]:self.offsets[run + 1]]
+
+    def runs(self):
+        return [self.run(run) for run in range(self.number_of_runs)]
+
+    def sizes(self):
+        return np.diff(self.offsets)
+
+    def minimum(self):
+        """
+        Minimum value of every objective over all the runs.
+        """
+        return self.points.min(axis=0)
+
+    def maximum(self):
+        """
+        Maximum value of every objective over all the runs.
+        """
+        return self.points.max(axis=0)
+
+def load_fronts(paths_to_files, num_objectives, cache=None, dtype=np.float64):
+    """
+    Loads every file of paths_to_files as one run, through cache (a
+    frontio.FrontCache) when given, and returns the FrontSet of the runs.
+    """
+    fronts = []
+    for (run, path_to_file) in enumerate(paths_to_files):
+        with profiling.stage("load", run):
+            fronts.append(frontio.load_front(path_to_file, num_objectives, cache))
+    return FrontSet.from_fronts(fronts, num_objectives, dtype)
+
+def as_frontset(results, num_objectives=2):
+    """
+    Returns results itself when it already is a FrontSet, otherwise the
+    FrontSet of a list of runs given as results[run][objective].
+    """
+    if isinstance(results, FrontSet):
+        return results
+    return FrontSet.from_fronts([np.column_stack(run) for run in results], num_objectives)
@@ -0,0 +1,147 @@
+# Copyright 2015 Renzo Massobrio
+# Facultad de Ingenieria, UdelaR
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Binary store of the fronts of many runs, read through memory maps.
+
+A store is a folder with two files:
+    points.f8   the points of all the runs, one after the other, as raw
+                little-endian float64 rows of num_objectives values
+    index.json  the number of objectives, the offsets of the runs in
+                points.f8 and the result files (path, size, modification
+                time) the store was built from
+
+The store is built one result file at a time, so only one run is held in
+memory while writing, and readers get zero-copy views of a run or of all the
+points without loading them.
+"""
+
+import json
+import os
+import tempfile
+from os import path
+
+import numpy as np
+
+import frontio
+import frontset
+import profiling
+
+STORE_VERSION = 1
+DATA_FILE = "points.f8"
+INDEX_FILE = "index.json"
+DTYPE = np.dtype("<f8")
+
+class FrontStore:
+    """
+    Read-only view of a front store folder.
+    """
+
+    def __init__(self, path_to_store):
+        self.path = path_to_store
+        try:
+            with open(path.join(path_to_store, INDEX_FILE)) as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            raise Exception("ERROR: {0} is not a front store: {1}".format(path_to_store, e))
+        if index.get("version") != STORE_VERSION:
+            raise Exception("ERROR: {0}: unsupported front store version {1}".format(path_to_store, index.get("version")))
+
+        self.num_objectives = index["num_objectives"]
+        self.offsets = np.array(index["offsets"], dtype=np.int64)
+        self.sources = [tuple(source) for source in index["sources"]]
+
+        rows = int(self.offsets[-1])
+        data_file = path.join(path_to_store, DATA_FILE)
+        if path.getsize(data_file) != rows * self.num_objectives * DTYPE.itemsize:
+            raise Exception("ERROR: {0}: the size of {1} does not match the index".format(path_to_store, DATA_FILE))
+        if rows == 0:
+            # empty files can not be memory-mapped
+            self.points = np.empty((0, self.num_objectives), dtype=DTYPE)
+        else:
+            self.points = np.memmap(data_file, dtype=DTYPE, mode="r", shape=(rows, self.num_objectives))
+
+    @property
+    def number_of_runs(self):
+        return len(self.offsets) - 1
+
+    def run(self, run):
+        """
+        Returns the (n, num_objectives) view of the points of run.
+        """
+        return self.points[self.offsets[run]:self.offsets[run + 1]]
+
+    def runs(self):
+        return [self.run(run) for run in range(self.number_of_runs)]
+
+    def frontset(self):
+        """
+        Returns a frontset.FrontSet of the runs that maps the store, without
+        copying the points.
+        """
+        return frontset.FrontSet(self.points, self.offsets)
+
+    def is_built_from(self, paths_to_files, num_objectives):
+        """
+        Tells whether the store holds num_objectives columns of exactly
+        paths_to_files, none of which changed since the store was built.
+        """
+        return self.num_objectives == num_objectives and self.sources == [_source(p) for p in paths_to_files]
+
+def build(path_to_store, paths_to_files, num_objectives, cache=None):
+    """
+    Writes the store of the fronts in paths_to_files (one run per file,
+    loaded with frontio.load_front through cache) and returns it opened.
+    The index is replaced last, so readers never see a partial store.
+    """
+    os.makedirs(path_to_store, exist_ok=True)
+    offsets = [0]
+    sources = []
+    (handle, temporary) = tempfile.mkstemp(dir=path_to_store, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as f:
+            for (run, path_to_file) in enumerate(paths_to_files):
+                with profiling.stage("load", run):
+                    front = frontio.load_front(path_to_file, num_objectives, cache)
+                f.write(np.ascontiguousarray(front, dtype=DTYPE).tobytes())
+                offsets.append(offsets[-1] + len(front))
+                sources.append(_source(path_to_file))
+        os.replace(temporary, path.join(path_to_store, DATA_FILE))
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+    index = {"version": STORE_VERSION, "num_objectives": num_objectives, "offsets": offsets, "sources": sources}
+    (handle, temporary) = tempfile.mkstemp(dir=path_to_store, suffix=".tmp")
+    with os.fdopen(handle, "w") as f:
+        json.dump(index, f)
+    os.replace(temporary, path.join(path_to_store, INDEX_FILE))
+    return FrontStore(path_to_store)
+
+def load_or_build(path_to_store, paths_to_files, num_objectives, cache=None):
+    """
+    Opens the store at path_to_store when it is up to date with
+    paths_to_files, otherwise (re)builds it.
+    """
+    if path.exists(path.join(path_to_store, INDEX_FILE)):
+        store = FrontStore(path_to_store)
+        if store.is_built_from(paths_to_files, num_objectives):
+            return store
+    return build(path_to_store, paths_to_files, num_objectives, cache)
+
+def _source(path_to_file):
+    info = os.stat(path_to_file)
+    return (path.abspath(path_to_file), info.st_size, info.st_mtime_ns)
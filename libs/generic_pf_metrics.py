@@ -14,155 +14,466 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import multiprocessing
 import sys
+from os import path
 
 import numpy as np
-from pylab import *
-from scipy import stats
 
+import frontio
+import frontset
+import frontstore
 import metricslib
+import metricsresult
+import profiling
+import referencefront
+import sharedarrays
 import tabulatelib
 import gnuplot
-from hv import HyperVolume
 
-def print_non_dominated(point_set):
+def print_non_dominated(points):
     """
-    Computes and prints the non-dominated set of points in points_set.
+    Computes and prints the non-dominated set of the (n, m) array of points,
+    or of the union of a list of such arrays.
     """
+    if isinstance(points, list):
+        num_objectives = points[0].shape[1] if len(points) > 0 else 0
+    else:
+        num_objectives = points.shape[1]
 
-    if len(point_set) != 2:
-        print("Error. Invalid number of objectives. Only 2 objectives are supported.")
+    if num_objectives < 1:
+        print("Error. Invalid number of objectives. At least 1 objective is required.")
         exit(-1)
-    
-    global_pf = metricslib.pareto_frontier(point_set[0],point_set[1])
 
-    for i in range(len(global_pf[0])):
-        print("{0} {1}".format(global_pf[0][i],global_pf[1][i]))
-
-def compute(ref_pf_file, path_to_results, number_of_runs, objectives, results, normalize):
-    if normalize == None or normalize == '0' or normalize == 'false' or normalize == 'no':
-        normalize = False
-    elif normalize == '1' or normalize == 'true' or normalize == 'yes':
-        normalize = True
+    if isinstance(points, list):
+        global_pf = metricslib.non_dominated_union(points)
     else:
-        print("Error. Invalid <normalize> value. It must be 0/flase/no or 1/true/yes.")
+        global_pf = metricslib.non_dominated_points(points)
+
+    print_points(global_pf)
+
+def print_points(points):
+    """
+    Prints an (n, m) array of points, one per line.
+    """
+    for point in points.tolist():
+        print(" ".join("{0}".format(value) for value in point))
+
+def parse_options(argv, options):
+    """
+    Separates the --options in argv from the positional arguments. options
+    maps every accepted option name (without the dashes) to True when the
+    option takes a value. Returns (arguments, values), where values maps the
+    given options to their value, or to True for options without one.
+    """
+    arguments = []
+    values = {}
+    i = 0
+    while i < len(argv):
+        if argv[i].startswith("--"):
+            (name, has_value, value) = argv[i][2:].partition("=")
+            if name not in options:
+                print("Error. Unknown option --{0}.".format(name))
+                exit(-1)
+            if options[name] and not has_value:
+                if i + 1 >= len(argv):
+                    print("Error. Option --{0} requires a value.".format(name))
+                    exit(-1)
+                i += 1
+                value = argv[i]
+            values[name] = value if options[name] else True
+        else:
+            arguments.append(argv[i])
+        i += 1
+    return (arguments, values)
+
+# Multipliers of the suffixes accepted by parse_memory_size
+MEMORY_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+def parse_memory_size(value):
+    """
+    Parses a memory size such as 4096, 512M or 2G into bytes.
+    """
+    text = value.strip().upper()
+    if text.endswith("B"):
+        text = text[:-1]
+    unit = text[-1:] if text[-1:] in MEMORY_UNITS else ""
+    try:
+        size = int(float(text[:len(text) - len(unit)]) * MEMORY_UNITS[unit])
+    except ValueError:
+        size = 0
+    if size <= 0:
+        print("Error. Invalid memory size {0}. Use a number of bytes with an optional K, M, G or T suffix.".format(value))
         exit(-1)
+    return size
 
-    if len(objectives) != 2:
-        print("Error. Invalid number of objectives. Only 2 objectives are supported.")
+# Options shared by the scripts to control the cache of parsed front files
+CACHE_OPTIONS = {"no-cache": False, "clear-cache": False, "cache-dir": True}
+
+def front_cache(options, paths_to_results):
+    """
+    Returns the frontio.FrontCache selected by the CACHE_OPTIONS in options,
+    or None when --no-cache was given. With --clear-cache the cached fronts
+    of paths_to_results and the reference fronts cached with them are
+    removed first.
+    """
+    cache = frontio.FrontCache(options.get("cache-dir"))
+    if "clear-cache" in options:
+        for path_to_results in paths_to_results:
+            reference_cache(cache, path_to_results).clear()
+            cache.clear(path_to_results)
+    if "no-cache" in options:
+        return None
+    return cache
+
+# Options shared by the scripts that plot the fronts
+PLOT_OPTIONS = {"no-plot": False, "plot-runs": False}
+
+# Options shared by the scripts to write their results to a file
+OUTPUT_OPTIONS = {"output": True, "output-format": True}
+
+def output_report(options):
+    """
+    Checks the OUTPUT_OPTIONS in options and tells whether the report is
+    printed: it is not when the results are written to the standard output.
+    """
+    output_format = options.get("output-format")
+    if output_format != None and output_format not in metricsresult.OUTPUT_FORMATS:
+        print("Error. Invalid output format {0}. It must be one of {1}.".format(output_format, ", ".join(metricsresult.OUTPUT_FORMATS)))
         exit(-1)
+    return options.get("output") != "-"
 
-    raw_global_pf = None
-    x=[]
-    y=[]
-    
-    if ref_pf_file == None:
-        #Let's find the global pareto front combining all runs
-        for run in range (0,number_of_runs):
-            for item in results[run][0]:
-                x.append(item)
-            for item in results[run][1]:
-                y.append(item)
-    else:
-        #Let's load the pareto front file
-        with open(ref_pf_file) as pf_file:
-            for line in pf_file:
-                tokens = line.strip().split()
-                x.append(float(tokens[0]))
-                y.append(float(tokens[1]))
+def write_output(options, result):
+    """
+    Writes result (a metricsresult.MetricsResult) as selected by the
+    OUTPUT_OPTIONS in options, if any.
+    """
+    if "output" in options:
+        result.write(options["output"], options.get("output-format"))
 
-    raw_global_pf = metricslib.pareto_frontier(x,y)
+# Options shared by the scripts to profile their stages
+PROFILE_OPTIONS = {"profile": False, "profile-json": True, "profile-cprofile": True, "profile-no-memory": False}
 
-    plot_path = gnuplot.plot_allruns(objectives, raw_global_pf, results, path_to_results)
+def start_profiling(options):
+    """
+    Enables the profiling.Profiler selected by the PROFILE_OPTIONS in
+    options and returns it, or returns None when no profiling was asked for.
+    --profile-json, --profile-cprofile and --profile-no-memory imply
+    --profile.
+    """
+    if set(PROFILE_OPTIONS).isdisjoint(options):
+        return None
+    return profiling.enable("profile-no-memory" not in options, "profile-cprofile" in options)
 
-    #Now let's calculate some metrics
-    gd_list=[]
-    spa_list=[]
-    spr_list=[]
-    hv_list=[]
+def finish_profiling(options, profiler):
+    """
+    Stops profiler (the result of start_profiling), prints the summary of
+    its stages and writes the files asked for in options. The summary goes
+    to the standard error when the results are written to the standard
+    output (--output -), so that they can still be parsed.
+    """
+    if profiler == None:
+        return
+    profiling.disable()
+    f = sys.stdout if output_report(options) else sys.stderr
+    profiler.print_summary(f)
+    if "profile-json" in options:
+        profiler.dump_json(options["profile-json"])
+        print("You can find the profile of every stage and run at: {0}".format(options["profile-json"]), file=f)
+    if "profile-cprofile" in options:
+        profiler.dump_cprofile(options["profile-cprofile"])
+        print("You can find the cProfile statistics at: {0}".format(options["profile-cprofile"]), file=f)
 
-    if normalize:
-        global_pf = metricslib.normalize_front(raw_global_pf, raw_global_pf)
-    else:
-        global_pf = raw_global_pf        
+def evaluate_run(approx_pf, global_pf, raw_global_pf, referencePoint, normalize, global_pf_index=None, raw_global_pf_index=None, run=None):
+    """
+    Computes the metrics of approx_pf, the (n, m) array of the front of one
+    run: generational distance,
+    spacing, spread, hypervolume, IGD, IGD+ and the additive and
+    multiplicative epsilon indicators. global_pf_index and
+    raw_global_pf_index are the metricslib.FrontIndex of global_pf and
+    raw_global_pf, built once for all the runs. The metrics share a
+    metricslib.FrontContext of the run, so the run is normalized, sorted and
+    indexed only once, the first metric that needs it pays for it. run is
+    the number of the run the profiling stages are recorded for.
+    """
+    if global_pf_index == None:
+        global_pf_index = metricslib.FrontIndex(global_pf)
+    if raw_global_pf_index == None:
+        raw_global_pf_index = metricslib.FrontIndex(raw_global_pf)
 
-    #The reference point to calculate the hypervolume is the projection of the global PF ends
-    max_objective_0 = max(np.array(global_pf[0]))
-    max_objective_1 = max(np.array(global_pf[1]))
-    referencePoint = [max_objective_0, max_objective_1]
+    bounds = raw_global_pf_index.bounds if normalize else None
+    context = metricslib.FrontContext(approx_pf, bounds)
 
-    for run in range(0,number_of_runs):
-        if normalize:
-            approx_pf = metricslib.normalize_front(raw_global_pf, (results[run][0],results[run][1]))
-        else:
-            approx_pf = (results[run][0], results[run][1])
-        
-        gd_list.append(metricslib.generational_distance(approx_pf[0],approx_pf[1],global_pf))
-        
-        spa_list.append(metricslib.spacing(approx_pf[0],approx_pf[1]))
-        
-        spr_list.append(metricslib.spread(approx_pf[0],approx_pf[1],global_pf))
-        
+    with profiling.stage("metrics.gd", run):
+        gd = metricslib.generational_distance(context, None, global_pf_index)
+
+    with profiling.stage("metrics.spacing", run):
+        spa = metricslib.spacing(context)
+
+    with profiling.stage("metrics.spread", run):
+        spr = metricslib.spread(context, None, global_pf_index)
+
+    with profiling.stage("metrics.hypervolume", run):
         hyperVolume = metricslib.HyperVolume(referencePoint)
-        front = [[approx_pf[0][i], approx_pf[1][i]] for i in range(len(approx_pf[0]))]
-        hv_list.append(hyperVolume.compute(front))
+        hv = hyperVolume.compute(context.points)
 
-    #Compute the quotient between the PF of each run and the global PF
-    hyperVolume = HyperVolume(referencePoint)
-    ref_front = [[global_pf[0][i],global_pf[1][i]] for i in range(len(global_pf[0]))]
-    hv_ideal_pf = hyperVolume.compute(ref_front)
-    hv_quotients_list=[x/float(hv_ideal_pf) for x in hv_list]
+    with profiling.stage("metrics.igd", run):
+        igd = metricslib.inverted_generational_distance(context, global_pf_index)
+    with profiling.stage("metrics.igd_plus", run):
+        igd_plus = metricslib.inverted_generational_distance_plus(context, global_pf_index)
+    with profiling.stage("metrics.epsilon", run):
+        eps_add = metricslib.additive_epsilon(context, global_pf_index)
 
-    # Print the results
-    print("")
-    print("########################")
-    print("Generational Distance")
-    print("########################")
-    print("Min (best): {0}".format(np.min(np.array(gd_list))))
-    print("Mean      : {0}".format(np.mean(np.array(gd_list))))
-    print("Median    : {0}".format(np.median(np.array(gd_list))))
-    print("Std dev   : {0}".format(np.std(np.array(gd_list))))
-    (w,p_value) = stats.shapiro(gd_list)
-    print("Shapiro-wilk test: p-value={0} w={0}".format(p_value,w))
+        #The multiplicative epsilon is computed on the values before normalization
+        if (context.raw_points > 0).all() and (raw_global_pf_index.points > 0).all():
+            eps_mult = metricslib.multiplicative_epsilon(context, raw_global_pf_index)
+        else:
+            eps_mult = float("nan")
 
-    print("")
-    print("########################")
-    print("Spacing")
-    print("########################")
-    print("Min (best): {0}".format(np.min(np.array(spa_list))))
-    print("Mean      : {0}".format(np.mean(np.array(spa_list))))
-    print("Median    : {0}".format(np.median(np.array(spa_list))))
-    print("Std dev   : {0}".format(np.std(np.array(spa_list))))
-    (w,p_value) = stats.shapiro(spa_list)
-    print("Shapiro-wilk test: p-value={0} w={1}".format(p_value,w))
-    
-    print("")
-    print("########################")
-    print("Spread")
-    print("########################")
-    print("Min (best): {0}".format(np.min(np.array(spr_list))))
-    print("Mean      : {0}".format(np.mean(np.array(spr_list))))
-    print("Median    : {0}".format(np.median(np.array(spr_list))))
-    print("Std dev   : {0}".format(np.std(np.array(spr_list))))
-    (w,p_value) = stats.shapiro(spr_list)
-    print("Shapiro-wilk test: p-value={0} w={1}".format(p_value,w))
+    return (gd, spa, spr, hv, igd, igd_plus, eps_add, eps_mult)
 
+def print_statistics(title, statistics, maximize=False):
+    """
+    Prints the metricsresult.summary_statistics of a metric.
+    """
     print("")
     print("########################")
-    print("Relative hypervolume")
+    print(title)
     print("########################")
-    print("Max (best): {0}".format(np.max(np.array(hv_quotients_list))))
-    print("Mean      : {0}".format(np.mean(np.array(hv_quotients_list))))
-    print("Median    : {0}".format(np.median(np.array(hv_quotients_list))))
-    print("Std dev   : {0}".format(np.std(np.array(hv_quotients_list))))
-    (w,p_value) = stats.shapiro(hv_quotients_list)
-    print("Shapiro-wilk test: p-value={0} w={1}".format(p_value,w))
-    print("")
-    print("You can find the plot at: {0}".format(plot_path))
+    if statistics == None:
+        print("Not defined for these fronts.")
+        return
+    if maximize:
+        print("Max (best): {0}".format(statistics["best"]))
+    else:
+        print("Min (best): {0}".format(statistics["best"]))
+    print("Mean      : {0}".format(statistics["mean"]))
+    print("Median    : {0}".format(statistics["median"]))
+    print("Std dev   : {0}".format(statistics["std"]))
+    print("Shapiro-wilk test: p-value={0} w={1}".format(statistics["shapiro_p"],statistics["shapiro_w"]))
+
+def load_scipy():
+    """
+    Imports the SciPy modules that the metrics and their statistics use.
+    They are loaded lazily, so this is called before the profiling stages
+    start, which then time the metrics and not the import.
+    """
+    import scipy.spatial
+    import scipy.stats
+
+# Shared data of a worker process of evaluate_runs
+_worker_memory = None
+_worker_arrays = None
+_worker_runs = None
+_worker_index = None
+_worker_raw_index = None
+_worker_normalize = None
+
+def _init_worker(spec, path_to_store, normalize, trace_memory=None):
+    """
+    trace_memory is None when the parent is not profiling, otherwise the
+    worker records its stages with the memory tracing of the parent.
+    """
+    global _worker_memory, _worker_arrays, _worker_runs, _worker_index, _worker_raw_index, _worker_normalize
+    load_scipy()
+    (_worker_memory, _worker_arrays) = sharedarrays.attach(spec)
+    if path_to_store != None:
+        _worker_runs = frontstore.FrontStore(path_to_store).points
+    else:
+        _worker_runs = _worker_arrays["runs"]
+    _worker_index = metricslib.FrontIndex((_worker_arrays["global_pf"][:, 0], _worker_arrays["global_pf"][:, 1]))
+    _worker_raw_index = metricslib.FrontIndex((_worker_arrays["raw_global_pf"][:, 0], _worker_arrays["raw_global_pf"][:, 1]))
+    _worker_normalize = normalize
+    if trace_memory != None:
+        profiling.enable(trace_memory)
 
+def _evaluate_shared_run(run):
+    arrays = _worker_arrays
+    (start, end) = arrays["offsets"][run:run + 2]
+    approx_pf = _worker_runs[start:end]
+    global_pf = (arrays["global_pf"][:, 0], arrays["global_pf"][:, 1])
+    raw_global_pf = (arrays["raw_global_pf"][:, 0], arrays["raw_global_pf"][:, 1])
+    referencePoint = arrays["reference_point"].tolist()
+    values = evaluate_run(approx_pf, global_pf, raw_global_pf, referencePoint, _worker_normalize, _worker_index, _worker_raw_index, run)
+    #The stages of the run go back to the parent with its values
+    profiler = profiling.active()
+    return (values, profiler.take() if profiler != None else [])
 
+def evaluate_runs(results, number_of_runs, global_pf, raw_global_pf, referencePoint, normalize, jobs=1, store=None):
+    """
+    Evaluates the first number_of_runs runs of results (a frontset.FrontSet)
+    with evaluate_run and returns the list of results, in run order. With
+    jobs > 1 the runs are spread over a pool of worker processes. The points
+    of the runs, the global fronts and the reference point are handed to the
+    workers once through shared memory, so every task only carries the
+    number of its run, and every worker indexes the global front once. When
+    the runs come from a frontstore.FrontStore, the workers map the store
+    instead of receiving a copy of the runs.
+    """
+    if jobs <= 1 or number_of_runs <= 1:
+        global_pf_index = metricslib.FrontIndex(global_pf)
+        raw_global_pf_index = metricslib.FrontIndex(raw_global_pf)
+        return [evaluate_run(results.run(run), global_pf, raw_global_pf, referencePoint, normalize, global_pf_index, raw_global_pf_index, run)
+                for run in range(0,number_of_runs)]
 
+    arrays = {
+        "global_pf": np.column_stack(global_pf),
+        "raw_global_pf": np.column_stack(raw_global_pf),
+        "reference_point": np.array(referencePoint, dtype=np.float64),
+        "offsets": results.offsets[:number_of_runs + 1],
+    }
+    if store != None:
+        path_to_store = store.path
+    else:
+        path_to_store = None
+        arrays["runs"] = results.points[:results.offsets[number_of_runs]]
+    profiler = profiling.active()
+    trace_memory = profiler.trace_memory if profiler != None else None
+    with sharedarrays.SharedArrays(arrays) as shared:
+        with multiprocessing.Pool(min(jobs, number_of_runs), _init_worker, (shared.spec, path_to_store, normalize, trace_memory)) as pool:
+            evaluated = pool.map(_evaluate_shared_run, range(0,number_of_runs))
+    if profiler != None:
+        for (_, records) in evaluated:
+            profiler.add(records)
+    return [values for (values, _) in evaluated]
+
+def parse_normalize(normalize):
+    """
+    Returns the boolean value of the <normalize> argument of the scripts.
+    """
+    if normalize == None or normalize == '0' or normalize == 'false' or normalize == 'no':
+        return False
+    elif normalize == '1' or normalize == 'true' or normalize == 'yes':
+        return True
+    print("Error. Invalid <normalize> value. It must be 0/flase/no or 1/true/yes.")
+    exit(-1)
+
+def reference_cache(cache, path_to_reference):
+    """
+    Returns the referencefront.ReferenceCache that goes with cache (a
+    frontio.FrontCache) for the global front of the files in
+    path_to_reference, or None when caching is disabled.
+    """
+    if cache == None:
+        return None
+    return referencefront.ReferenceCache(cache.directory_for(path_to_reference))
 
+def compute(ref_pf_file, path_to_results, number_of_runs, objectives, results, normalize, jobs=1, store=None, cache=None, plot=True, plot_runs=False, report=True):
+    """
+    Computes, prints and plots the metrics of the first number_of_runs runs
+    of results, and returns them as a metricsresult.MetricsResult. The plot
+    of all the runs (and, with plot_runs, the plot of every run) is rendered
+    in the background while the metrics are computed and printed, its path
+    is printed once it is done. Nothing is printed when report is not set.
+    """
+    normalize = parse_normalize(normalize)
+
+    if len(objectives) != 2:
+        print("Error. Invalid number of objectives. Only 2 objectives are supported.")
+        exit(-1)
+
+    results = frontset.as_frontset(results)
+
+    if ref_pf_file == None:
+        #Let's find the global pareto front combining all runs
+        candidates = [results.run(run) for run in range(0,number_of_runs)]
+        path_to_reference = path_to_results
+    else:
+        #Let's load the pareto front file
+        with profiling.stage("load.reference"):
+            candidates = [frontio.load_front(ref_pf_file, 2, cache)]
+        path_to_reference = path.dirname(path.abspath(ref_pf_file))
+
+    #The filtered global front, its bounds, the reference point and its hypervolume are cached by content
+    with profiling.stage("reference"):
+        reference = referencefront.load_or_compute(candidates, normalize, reference_cache(cache, path_to_reference))
+    raw_global_pf = reference.raw_global_pf
+
+    plots = None
+    if plot:
+        with profiling.stage("plot"):
+            plots = gnuplot.BackgroundPlots(objectives, raw_global_pf, results, path_to_results, plot_runs, jobs, store)
+
+    try:
+        #Now let's calculate some metrics
+        global_pf = reference.global_pf
+        referencePoint = reference.reference_point
+
+        load_scipy()
+        with profiling.stage("metrics"):
+            metrics = evaluate_runs(results, number_of_runs, global_pf, raw_global_pf, referencePoint, normalize, jobs, store)
+        values = dict(zip([key for (key, _, _) in metricsresult.METRICS], [list(values) for values in zip(*metrics)]))
+
+        #Compute the quotient between the PF of each run and the global PF
+        values["relative_hv"]=[x/float(reference.hv_ideal) for x in values["relative_hv"]]
+        result = metricsresult.MetricsResult(values, normalize, reference.hv_ideal, referencePoint)
+
+        # Print the results
+        with profiling.stage("summary"):
+            summary = result.summary()
+            if report:
+                for (key, title, maximize) in metricsresult.METRICS:
+                    print_statistics(title, summary[key], maximize)
+    except BaseException:
+        if plots != None:
+            plots.terminate()
+        raise
+    if report:
+        print("")
+    if plots != None:
+        with profiling.stage("plot.wait"):
+            (result.plot_path, run_plot_paths) = plots.wait()
+        if report:
+            print("You can find the plot at: {0}".format(result.plot_path))
+            if run_plot_paths != None:
+                print("You can find the plot of every run at: {0}".format(path.join(path_to_results, gnuplot.RUN_PLOT_NAME.format("*"))))
+    return result
+
+# Columns of the comparison table, in the order of the values of evaluate_run
+COMPARISON_METRICS = ["GD", "Spacing", "Spread", "Relative HV", "IGD", "IGD+", "Additive eps", "Multiplicative eps"]
+
+def compare(names, frontsets, ref_pf_file, normalize, jobs=1, cache=None, path_to_reference=".", tablefmt="simple"):
+    """
+    Evaluates the runs of several algorithms against one global front and
+    prints a table with the mean and standard deviation of every metric for
+    every algorithm. names[i] is the name of the algorithm whose runs are in
+    the frontset.FrontSet frontsets[i]. The global front is the one in
+    ref_pf_file or, without it, the front of the runs of all the algorithms,
+    cached in the cache folder of path_to_reference. All the runs are
+    evaluated in a single pool of jobs processes.
+    """
+    normalize = parse_normalize(normalize)
+    results = frontset.FrontSet.concatenate(frontsets)
+
+    if ref_pf_file == None:
+        candidates = results.runs()
+    else:
+        with profiling.stage("load.reference"):
+            candidates = [frontio.load_front(ref_pf_file, 2, cache)]
+        path_to_reference = path.dirname(path.abspath(ref_pf_file))
+    with profiling.stage("reference"):
+        reference = referencefront.load_or_compute(candidates, normalize, reference_cache(cache, path_to_reference))
 
+    load_scipy()
+    with profiling.stage("metrics"):
+        metrics = np.array(evaluate_runs(results, results.number_of_runs, reference.global_pf, reference.raw_global_pf,
+                                         reference.reference_point, normalize, jobs), ndmin=2)
+    #The hypervolume of every run is relative to the one of the global front
+    metrics[:, COMPARISON_METRICS.index("Relative HV")] /= float(reference.hv_ideal)
 
+    rows = []
+    first_run = 0
+    for (name, algorithm_runs) in zip(names, frontsets):
+        values = metrics[first_run:first_run + algorithm_runs.number_of_runs]
+        first_run += algorithm_runs.number_of_runs
+        row = [name, len(values)]
+        for column in values.T:
+            if np.isnan(column).any():
+                row.append(None)
+            else:
+                row.append("{0:.6g} ({1:.2g})".format(np.mean(column), np.std(column)))
+        rows.append(row)
 
+    print("Mean (std dev) over the runs of every algorithm. Best values: min for all the metrics but Relative HV (max).")
+    print(tabulatelib.tabulate(rows, headers=["Algorithm", "Runs"] + COMPARISON_METRICS, tablefmt=tablefmt, missingval="-"))
+    return rows
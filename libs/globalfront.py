@@ -0,0 +1,124 @@
+# Copyright 2015 Renzo Massobrio
+# Facultad de Ingenieria, UdelaR
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Persistent aggregated Pareto front, updated as new runs arrive.
+
+The front is saved in an .npz file together with the list of the result
+files already folded into it (path, size and modification time), so an
+update only reads the runs that are not in the list yet. The aggregated front
+is the same that pf_gather computes from all the runs at once: the frontier
+of metricslib.pareto_frontier_array for two objectives and the non-dominated
+set of nondominated.nondominated otherwise.
+"""
+
+import os
+import tempfile
+from os import path
+
+import numpy as np
+
+import frontio
+import metricslib
+import nondominated
+
+class GlobalFront:
+    """
+    Aggregated front of a set of runs, sorted lexicographically.
+    """
+
+    def __init__(self, num_objectives):
+        self.num_objectives = num_objectives
+        self.points = np.empty((0, num_objectives))
+        # path -> (size, modification time) of the folded runs
+        self.runs = {}
+
+    @staticmethod
+    def load(path_to_file):
+        try:
+            with np.load(path_to_file) as data:
+                front = GlobalFront(data["points"].shape[1])
+                front.points = data["points"]
+                for (run, size, mtime) in zip(data["runs"].tolist(), data["sizes"].tolist(), data["mtimes"].tolist()):
+                    front.runs[run] = (size, mtime)
+        except (OSError, ValueError, KeyError) as e:
+            raise Exception("ERROR: {0} is not a global front file: {1}".format(path_to_file, e))
+        return front
+
+    def save(self, path_to_file):
+        """
+        Writes the front to path_to_file, replacing it only once the new file
+        is complete.
+        """
+        runs = sorted(self.runs)
+        directory = path.dirname(path.abspath(path_to_file))
+        (handle, temporary) = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as f:
+                np.savez(f, points=self.points, runs=np.array(runs, dtype=str),
+                         sizes=np.array([self.runs[run][0] for run in runs], dtype=np.int64),
+                         mtimes=np.array([self.runs[run][1] for run in runs], dtype=np.int64))
+            os.replace(temporary, path_to_file)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def pending(self, paths_to_files):
+        """
+        Returns the files of paths_to_files that were not folded in yet.
+        Folded runs can not be taken out of the front, so a folded file that
+        changed since is an error.
+        """
+        pending = []
+        for path_to_file in paths_to_files:
+            run = path.abspath(path_to_file)
+            if run not in self.runs:
+                pending.append(path_to_file)
+                continue
+            info = os.stat(run)
+            if self.runs[run] != (info.st_size, info.st_mtime_ns):
+                raise Exception("ERROR: {0} changed after it was folded into the global front, the front must be rebuilt".format(path_to_file))
+        return pending
+
+    def update(self, paths_to_files, cache=None):
+        """
+        Folds the runs of paths_to_files that are not in the front yet and
+        returns how many were folded. Every new run is reduced to its own
+        front as it is loaded, then the survivors are merged into the sorted
+        front, so the cost depends on the new runs and the size of the front,
+        not on the runs folded before.
+        """
+        pending = self.pending(paths_to_files)
+        fronts = []
+        for path_to_file in pending:
+            info = os.stat(path_to_file)
+            fronts.append(self._reduce(frontio.load_front(path_to_file, self.num_objectives, cache)))
+            self.runs[path.abspath(path_to_file)] = (info.st_size, info.st_mtime_ns)
+
+        if len(fronts) > 0:
+            new_points = np.concatenate(fronts)
+            if self.num_objectives == 2:
+                (_, self.points) = metricslib.pareto_frontier_array(np.concatenate((self.points, self._reduce(new_points))))
+            else:
+                self.points = nondominated.merge(self.points, new_points)
+        return len(pending)
+
+    def _reduce(self, points):
+        if self.num_objectives == 2:
+            (_, front) = metricslib.pareto_frontier_array(points)
+        else:
+            (_, front) = nondominated.nondominated(points)
+        return front
@@ -24,25 +24,182 @@
 #  
 #  
 
+import multiprocessing
 from os import path
 import numpy as np
-from pylab import *
 
-def plot_allruns(objectives, global_pf, results, path_to_results):
-    # Define colors for plots
+import frontset
+import frontstore
+import profiling
+import sharedarrays
+
+# Non-interactive backend the plots are rendered with, they are only saved
+BACKEND = "Agg"
+
+def pyplot():
+    """
+    Returns matplotlib.pyplot, loading matplotlib with the BACKEND the first
+    time, so the scripts that do not plot never import it.
+    """
+    import matplotlib
+    matplotlib.use(BACKEND)
+    import matplotlib.pyplot
+    return matplotlib.pyplot
+
+# Above this number of points the runs are drawn as a density (hexbin) map
+# instead of a scatter of every point, so the time to render does not grow
+# with the data.
+DENSITY_THRESHOLD = 20000
+
+# Names of the plots saved in the folder of the results
+GLOBAL_PLOT_NAME = "GlobalPF.png"
+RUN_PLOT_NAME = "RunPF.{0}.png"
+
+# Number of hexagons across the x axis of the density map
+DENSITY_GRIDSIZE = 200
+
+# Above this number of runs the colours of the runs are explained by a
+# colour bar instead of one legend entry per run.
+MAX_LEGEND_RUNS = 30
+
+def plot_allruns(objectives, global_pf, results, path_to_results, density_threshold=DENSITY_THRESHOLD):
+    """
+    Plots the points of all the runs (a frontset.FrontSet, or a list of
+    runs given as results[run][objective]) and the global front, and saves
+    the plot as GlobalPF.png in path_to_results. The runs are drawn as a
+    single rasterized scatter coloured by run or, beyond density_threshold
+    points, as a hexbin map of the number of points. The global front is
+    always drawn on top with its exact points.
+    """
+    plt = pyplot()
+    results = frontset.as_frontset(results)
+    points = results.points
+    number_of_runs = results.number_of_runs
+
+    (figure, axes) = plt.subplots()
     cmap = plt.get_cmap('gnuplot')
-    colors = [cmap(p) for p in np.linspace(0, 1, len(results))]
-
-    for run in range(len(results)):
-        scatter(results[run][0], results[run][1], label="Run #%d"%run, color=colors[run])
-    
-    plot(global_pf[0], global_pf[1], color="black", linestyle=":", label="Global PF")
-    grid(True)
-    xlabel(objectives[0])
-    ylabel(objectives[1])
-    title("Global PF")
-    legend(loc=0,ncol=3 ,prop={'size':10},scatterpoints = 1)
-
-    plot_path = path.join(path_to_results, "GlobalPF.png")
-    savefig(plot_path)
+
+    density = len(points) > density_threshold
+    with profiling.stage("plot.runs"):
+        if density:
+            layer = axes.hexbin(points[:, 0], points[:, 1], gridsize=DENSITY_GRIDSIZE, bins="log", mincnt=1, cmap="Blues", rasterized=True)
+            figure.colorbar(layer, ax=axes, label="Points")
+        else:
+            # the colour of every point is the one of its run
+            runs = np.repeat(np.arange(number_of_runs), results.sizes())
+            layer = axes.scatter(points[:, 0], points[:, 1], c=runs, cmap=cmap, vmin=0, vmax=max(number_of_runs - 1, 1), rasterized=True)
+            if number_of_runs <= MAX_LEGEND_RUNS:
+                colors = [cmap(p) for p in np.linspace(0, 1, number_of_runs)]
+                for run in range(number_of_runs):
+                    axes.scatter([], [], label="Run #%d"%run, color=colors[run])
+            else:
+                figure.colorbar(layer, ax=axes, label="Run")
+
+    # the global front must stand out of the dark areas of the density map
+    axes.plot(global_pf[0], global_pf[1], color="red" if density else "black", linestyle=":", label="Global PF")
+    return _save(plt, figure, axes, objectives, "Global PF", path.join(path_to_results, GLOBAL_PLOT_NAME))
+
+def plot_run(objectives, global_pf, front, run, path_to_results):
+    """
+    Plots the (n, 2) array front of run over the global front and saves the
+    plot as RunPF.<run>.png in path_to_results.
+    """
+    plt = pyplot()
+    (figure, axes) = plt.subplots()
+    axes.scatter(front[:, 0], front[:, 1], label="Run #%d"%run, color=plt.get_cmap('gnuplot')(0.5), rasterized=True)
+    axes.plot(global_pf[0], global_pf[1], color="black", linestyle=":", label="Global PF")
+    return _save(plt, figure, axes, objectives, "Run #%d"%run, path.join(path_to_results, RUN_PLOT_NAME.format(run)))
+
+def _save(plt, figure, axes, objectives, title, plot_path):
+    axes.grid(True)
+    axes.set_xlabel(objectives[0])
+    axes.set_ylabel(objectives[1])
+    axes.set_title(title)
+    axes.legend(loc=0,ncol=3 ,prop={'size':10},scatterpoints = 1)
+
+    with profiling.stage("plot.save"):
+        figure.savefig(plot_path)
+    plt.close(figure)
     return plot_path
+
+class BackgroundPlots:
+    """
+    Renders the plot of all the runs (and, with per_run, the plot of every
+    run) in a pool of worker processes, while the caller goes on. The runs
+    and the global front are handed to the workers once through shared
+    memory, or the workers map the frontstore.FrontStore they come from.
+    The global plot goes first, the plots of the runs are spread over jobs
+    processes. wait() returns the paths of the plots.
+    """
+
+    def __init__(self, objectives, global_pf, results, path_to_results, per_run=False, jobs=1, store=None):
+        results = frontset.as_frontset(results)
+        arrays = {"global_pf": np.column_stack(global_pf), "offsets": results.offsets}
+        if store != None:
+            path_to_store = store.path
+        else:
+            path_to_store = None
+            arrays["runs"] = results.points
+        self.shared = sharedarrays.SharedArrays(arrays)
+        processes = max(1, min(jobs, results.number_of_runs)) if per_run else 1
+        try:
+            self.pool = multiprocessing.Pool(processes, _init_plot_worker, (self.shared.spec, path_to_store, objectives, path_to_results))
+        except BaseException:
+            self.shared.close()
+            raise
+        self.global_plot = self.pool.apply_async(_plot_all_shared_runs)
+        self.run_plots = None
+        if per_run:
+            self.run_plots = self.pool.map_async(_plot_shared_run, range(results.number_of_runs))
+        self.pool.close()
+
+    def wait(self):
+        """
+        Waits for the plots and returns (global plot path, list of the run
+        plot paths or None). An error of a worker is raised here.
+        """
+        try:
+            plot_path = self.global_plot.get()
+            run_plot_paths = self.run_plots.get() if self.run_plots != None else None
+            self.pool.join()
+        finally:
+            self.terminate()
+        return (plot_path, run_plot_paths)
+
+    def terminate(self):
+        """
+        Stops the workers, if they are still running, and releases the
+        shared memory.
+        """
+        if self.pool != None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+            self.shared.close()
+
+# Shared data of a worker process of BackgroundPlots
+_worker_memory = None
+_worker_results = None
+_worker_global_pf = None
+_worker_objectives = None
+_worker_path = None
+
+def _init_plot_worker(spec, path_to_store, objectives, path_to_results):
+    global _worker_memory, _worker_results, _worker_global_pf, _worker_objectives, _worker_path
+    # the stages of the plots are not recorded, the parent times the wait
+    profiling.disable()
+    (_worker_memory, arrays) = sharedarrays.attach(spec)
+    if path_to_store != None:
+        points = frontstore.FrontStore(path_to_store).points
+    else:
+        points = arrays["runs"]
+    _worker_results = frontset.FrontSet(points[:arrays["offsets"][-1]], arrays["offsets"])
+    _worker_global_pf = (arrays["global_pf"][:, 0], arrays["global_pf"][:, 1])
+    _worker_objectives = objectives
+    _worker_path = path_to_results
+
+def _plot_all_shared_runs():
+    return plot_allruns(_worker_objectives, _worker_global_pf, _worker_results, _worker_path)
+
+def _plot_shared_run(run):
+    return plot_run(_worker_objectives, _worker_global_pf, _worker_results.run(run), run, _worker_path)
@@ -1,4 +1,4 @@
-#    Copyright (C) 2010 Simon Wessing
+#    Copyright (C) 2010 Simon Wessing
 #    TU Dortmund University
 #
 #    This program is free software: you can redistribute it and/or modify
@@ -17,6 +17,19 @@
 
 __author__ = "Simon Wessing"
 
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque, namedtuple
+from math import sqrt
+from statistics import NormalDist
+
+import numpy as np
+
+import nondominated
+
+HyperVolumeEstimate = namedtuple("HyperVolumeEstimate", ["value", "lower", "upper", "samples"])
+
 
 class HyperVolume:
     """
@@ -29,9 +42,15 @@ class HyperVolume:
 
     """
 
-    def __init__(self, referencePoint):
-        """Constructor."""
+    def __init__(self, referencePoint, compact=True):
+        """Constructor.
+
+        With compact set, the general algorithm keeps its linked lists in an
+        ArrayMultiList instead of a MultiList of Node objects.
+
+        """
         self.referencePoint = referencePoint
+        self.compact = compact
         self.list = []
 
 
@@ -41,31 +60,289 @@ class HyperVolume:
         Before the HV computation, front and reference point are translated, so
         that the reference point is [0, ..., 0].
 
+        Fronts with two or three objectives are handled by the O(n log n)
+        sweeps in hv2D and hv3D. The general dimension-sweep algorithm is used
+        for more objectives.
+
         """
+        (relevant, relevantPoints) = self.shiftFront(front)
+        return self.hvShifted(relevantPoints)
 
-        def weaklyDominates(point, other):
-            for i in range(len(point)):
-                if point[i] > other[i]:
-                    return False
-            return True
 
-        relevantPoints = []
-        referencePoint = self.referencePoint
-        dimensions = len(referencePoint)
-        for point in front:
-            # only consider points that dominate the reference point
-            if weaklyDominates(point, referencePoint):
-                relevantPoints.append(point)
-        if any(referencePoint):
-            # shift points so that referencePoint == [0, ..., 0]
-            # this way the reference point doesn't have to be explicitly used
-            # in the HV computation
-            for j in range(len(relevantPoints)):
-                relevantPoints[j] = [relevantPoints[j][i] - referencePoint[i] for i in range(dimensions)]
-        self.preProcess(relevantPoints)
+    def shiftFront(self, front):
+        """Returns (relevant, points): the mask of the points of front that
+        weakly dominate the reference point and those points translated so
+        that the reference point is [0, ..., 0].
+
+        """
+        referencePoint = np.asarray(self.referencePoint, dtype=np.float64)
+        points = np.asarray(front, dtype=np.float64).reshape(-1, len(referencePoint))
+        # only consider points that dominate the reference point
+        relevant = np.all(points <= referencePoint, axis=1)
+        # shift points so that referencePoint == [0, ..., 0]
+        # this way the reference point doesn't have to be explicitly used
+        # in the HV computation
+        return (relevant, points[relevant] - referencePoint)
+
+
+    def hvShifted(self, points):
+        """Hypervolume of an array of shifted points."""
+        dimensions = len(self.referencePoint)
+        if dimensions == 2:
+            return self.hv2D(points)
+        elif dimensions == 3:
+            return self.hv3D(points)
+        return self.hvGeneral(points)
+
+
+    def hv2D(self, points):
+        """Hypervolume of an (n, 2) array of shifted points.
+
+        The points are sorted by the second objective, the running minimum of
+        the first objective gives the height of every slice and the slice
+        areas are added up with a cumulative sum. The result is the same as
+        the one of the two-dimensional case of hvRecursive.
+
+        """
+        if len(points) == 0:
+            return 0.0
+        order = np.argsort(points[:, 1], kind="stable")
+        xs = np.minimum.accumulate(points[order, 0])
+        ys = points[order, 1]
+        areas = np.empty(len(ys))
+        areas[:-1] = xs[:-1] * (ys[:-1] - ys[1:])
+        areas[-1] = xs[-1] * ys[-1]
+        return float(np.cumsum(areas)[-1])
+
+
+    def hv3D(self, points):
+        """Hypervolume of an (n, 3) array of shifted points.
+
+        Dimension sweep of Beume et al. (2009): the points are visited in
+        ascending order of the third objective while the area dominated in the
+        first two objectives is updated incrementally. The two-dimensional
+        front is kept as a staircase in sorted lists searched with bisection.
+
+        """
+        if len(points) == 0:
+            return 0.0
+        order = np.argsort(points[:, 2], kind="stable")
+        sortedPoints = points[order].tolist()
+        # staircase: first objective ascending, second objective descending
+        stairX = []
+        stairY = []
+        area = 0.0
+        hvol = 0.0
+        for i in range(len(sortedPoints)):
+            (x, y, z) = sortedPoints[i]
+            k = bisect_right(stairX, x)
+            if k == 0 or stairY[k - 1] > y:
+                # the point is not dominated in the first two objectives, add
+                # the area between it and the staircase
+                start = bisect_left(stairX, x)
+                height = stairY[start - 1] if start > 0 else 0.0
+                lastX = x
+                end = start
+                while end < len(stairX) and stairY[end] >= y:
+                    area += (stairX[end] - lastX) * (height - y)
+                    lastX = stairX[end]
+                    height = stairY[end]
+                    end += 1
+                nextX = stairX[end] if end < len(stairX) else 0.0
+                area += (nextX - lastX) * (height - y)
+                stairX[start:end] = [x]
+                stairY[start:end] = [y]
+            nextZ = sortedPoints[i + 1][2] if i + 1 < len(sortedPoints) else 0.0
+            hvol += area * (nextZ - z)
+        return hvol
+
+
+    def hvGeneral(self, points):
+        """Hypervolume of an (n, d) array of shifted points, for any d."""
+        dimensions = len(self.referencePoint)
         bounds = [-1.0e308] * dimensions
-        hyperVolume = self.hvRecursive(dimensions - 1, len(relevantPoints), bounds)
-        return hyperVolume
+        if self.compact:
+            self.list = ArrayMultiList(dimensions, points)
+            return self.hvRecursiveCompact(dimensions - 1, len(points), bounds)
+        self.preProcess(points.tolist())
+        return self.hvRecursive(dimensions - 1, len(points), bounds)
+
+
+    def contributions(self, front):
+        """Returns the exclusive hypervolume contribution of every point.
+
+        The contribution of a point is the volume dominated by it and by no
+        other point of the front. Points that do not dominate the reference
+        point, that are weakly dominated by another point or that appear more
+        than once contribute 0, and dominated points are otherwise ignored, so
+        the front is expected to be non-dominated as in compute.
+
+        Two and three objectives are handled in O(n log n) by contributions2D
+        and contributions3D. For more objectives every contribution is the
+        volume of the point's box minus the hypervolume of its limit set (the
+        other points clipped to that box), see contributionsGeneral.
+
+        """
+        (relevant, points) = self.shiftFront(front)
+        result = np.zeros(len(relevant))
+        if len(points) == 0:
+            return result
+        (inverse, counts) = np.unique(points, axis=0, return_inverse=True, return_counts=True)[1:]
+        (kept, keptPoints) = nondominated.nondominated(points)
+        dimensions = len(self.referencePoint)
+        if dimensions == 2:
+            keptContributions = self.contributions2D(keptPoints)
+        elif dimensions == 3:
+            keptContributions = self.contributions3D(keptPoints)
+        else:
+            keptContributions = self.contributionsGeneral(keptPoints)
+        # all the copies of a repeated point contribute nothing
+        keptContributions[counts[np.ravel(inverse)[kept]] > 1] = 0.0
+        result[np.flatnonzero(relevant)[kept]] = keptContributions
+        return result
+
+
+    def contributions2D(self, points):
+        """Exclusive contributions of a shifted, non-dominated (n, 2) array
+        sorted lexicographically: every point owns the rectangle between its
+        two neighbours on the front.
+
+        """
+        xs = np.append(points[:, 0], 0.0)
+        ys = np.insert(points[:, 1], 0, 0.0)
+        return (xs[1:] - xs[:-1]) * (ys[:-1] - ys[1:])
+
+
+    def contributions3D(self, points):
+        """Exclusive contributions of a shifted, non-dominated (n, 3) array.
+
+        Dimension sweep in ascending order of the third objective in the
+        style of Emmerich and Fonseca (2011). The region that a point
+        dominates alone in the first two objectives is kept as a list of
+        boxes, each one opened at the height where it became exclusive. When
+        a new point covers part of a box, the covered part is closed and its
+        volume is credited to the box owner. Only the points removed from the
+        staircase and the two neighbours of the new point can lose area.
+
+        """
+        order = np.argsort(points[:, 2], kind="stable")
+        sortedPoints = points[order].tolist()
+        result = [0.0] * len(sortedPoints)
+        # staircase: first objective ascending, second objective descending
+        stairX = []
+        stairY = []
+        stairOwner = []
+        # boxes[i]: [lowX, upX, lowY, upY, lowZ] sorted by lowX, all with
+        # lowY equal to the second objective of point i
+        boxes = [None] * len(sortedPoints)
+        for i in range(len(sortedPoints)):
+            (x, y, z) = sortedPoints[i]
+            start = bisect_left(stairX, x)
+            end = start
+            while end < len(stairY) and stairY[end] >= y:
+                end += 1
+            if start > 0:
+                # cut the boxes of the left neighbour at x
+                ownerBoxes = boxes[stairOwner[start - 1]]
+                while ownerBoxes and ownerBoxes[-1][1] > x:
+                    box = ownerBoxes[-1]
+                    cutX = max(box[0], x)
+                    result[stairOwner[start - 1]] += (box[1] - cutX) * (box[3] - box[2]) * (z - box[4])
+                    if cutX > box[0]:
+                        box[1] = cutX
+                        break
+                    ownerBoxes.pop()
+            for j in range(start, end):
+                # the point covers the removed steps completely
+                for box in boxes[stairOwner[j]]:
+                    result[stairOwner[j]] += (box[1] - box[0]) * (box[3] - box[2]) * (z - box[4])
+                boxes[stairOwner[j]] = None
+            if end < len(stairY):
+                # cut the boxes of the right neighbour at y
+                for box in boxes[stairOwner[end]]:
+                    if box[3] <= y:
+                        break
+                    result[stairOwner[end]] += (box[1] - box[0]) * (box[3] - y) * (z - box[4])
+                    box[3] = y
+            # the new point owns the area between it and the old staircase
+            newBoxes = deque()
+            height = stairY[start - 1] if start > 0 else 0.0
+            lastX = x
+            for j in range(start, end + 1):
+                nextX = stairX[j] if j < len(stairX) else 0.0
+                if nextX > lastX and height > y:
+                    newBoxes.append([lastX, nextX, y, height, z])
+                if j < end:
+                    lastX = stairX[j]
+                    height = stairY[j]
+            boxes[i] = newBoxes
+            stairX[start:end] = [x]
+            stairY[start:end] = [y]
+            stairOwner[start:end] = [i]
+        for i in stairOwner:
+            for box in boxes[i]:
+                result[i] += (box[1] - box[0]) * (box[3] - box[2]) * (0.0 - box[4])
+        contributions = np.empty(len(sortedPoints))
+        contributions[order] = result
+        return contributions
+
+
+    def contributionsGeneral(self, points):
+        """Exclusive contributions of a shifted, non-dominated array, for any
+        number of objectives.
+
+        """
+        return np.array([self.exclusiveContribution(points, i) for i in range(len(points))])
+
+
+    def exclusiveContribution(self, points, index):
+        """Exclusive contribution of points[index] among the shifted,
+        non-dominated points: the volume of its box minus the hypervolume of
+        its limit set.
+
+        """
+        point = points[index]
+        others = np.delete(points, index, axis=0)
+        limitSet = nondominated.nondominated(np.maximum(others, point))[1]
+        return float(np.prod(-point)) - self.hvShifted(limitSet)
+
+
+    def greedyReduction(self, front, k):
+        """Removes the least contributing point of front k times.
+
+        Points that contribute nothing because they do not dominate the
+        reference point, are dominated or repeat a previous point are removed
+        first. After that, removing a point only changes the contribution of
+        the points whose limit point with respect to it is non-dominated, so
+        only those contributions are recomputed. Returns (kept, removed), the
+        indices of the remaining points and of the removed ones in removal
+        order.
+
+        """
+        (relevant, points) = self.shiftFront(front)
+        candidates = np.flatnonzero(relevant)
+        nonDominated = np.sort(nondominated.nondominated(points)[0])
+        removed = list(np.flatnonzero(~relevant))
+        removed += list(np.delete(candidates, nonDominated))
+        removed = removed[:k]
+        k -= len(removed)
+        points = points[nonDominated]
+        indices = candidates[nonDominated]
+        contributions = self.contributions(points + np.asarray(self.referencePoint, dtype=np.float64))
+        alive = np.ones(len(points), dtype=bool)
+        while k > 0 and alive.any():
+            i = int(np.argmin(np.where(alive, contributions, np.inf)))
+            alive[i] = False
+            removed.append(indices[i])
+            k -= 1
+            others = np.flatnonzero(alive)
+            otherPoints = points[others]
+            affected = nondominated.nondominated(np.maximum(otherPoints, points[i]))[0]
+            for j in affected:
+                contributions[others[j]] = self.exclusiveContribution(otherPoints, j)
+        removed = np.array(removed, dtype=np.intp)
+        kept = np.setdiff1d(np.arange(len(relevant)), removed)
+        return (kept, removed)
 
 
     def hvRecursive(self, dimIndex, length, bounds):
@@ -120,7 +397,7 @@ class HyperVolume:
                 hvol = qPrevDimIndex.volume[dimIndex] + qPrevDimIndex.area[dimIndex] * (qCargo[dimIndex] - qPrevDimIndex.cargo[dimIndex])
             else:
                 qArea[0] = 1
-                qArea[1:dimIndex+1] = [qArea[i] * -qCargo[i] for i in xrange(dimIndex)]
+                qArea[1:dimIndex+1] = [qArea[i] * -qCargo[i] for i in range(dimIndex)]
             q.volume[dimIndex] = hvol
             if q.ignore >= dimIndex:
                 qArea[dimIndex] = qPrevDimIndex.area[dimIndex]
@@ -147,6 +424,97 @@ class HyperVolume:
             return hvol
 
 
+    def hvRecursiveCompact(self, dimIndex, length, bounds):
+        """Same as hvRecursive, on an ArrayMultiList.
+
+        Nodes are integer indices and every attribute of a node is looked up
+        in the per-list arrays of the ArrayMultiList.
+
+        """
+        hvol = 0.0
+        nodeList = self.list
+        sentinel = nodeList.sentinel
+        if length == 0:
+            return hvol
+        elif dimIndex == 0:
+            # special case: only one dimension
+            # why using hypervolume at all?
+            return -nodeList.cargo[0][nodeList.next[0][sentinel]]
+        elif dimIndex == 1:
+            # special case: two dimensions, end recursion
+            next1 = nodeList.next[1]
+            cargo0 = nodeList.cargo[0]
+            cargo1 = nodeList.cargo[1]
+            q = next1[sentinel]
+            h = cargo0[q]
+            p = next1[q]
+            while p != sentinel:
+                hvol += h * (cargo1[q] - cargo1[p])
+                if cargo0[p] < h:
+                    h = cargo0[p]
+                q = p
+                p = next1[q]
+            hvol += h * cargo1[q]
+            return hvol
+        else:
+            remove = nodeList.remove
+            reinsert = nodeList.reinsert
+            hvRecursive = self.hvRecursiveCompact
+            cargo = nodeList.cargo
+            cargoDim = cargo[dimIndex]
+            prevDim = nodeList.prev[dimIndex]
+            nextDim = nodeList.next[dimIndex]
+            areas = nodeList.area
+            areaDim = areas[dimIndex]
+            volumeDim = nodeList.volume[dimIndex]
+            ignore = nodeList.ignore
+            p = sentinel
+            q = prevDim[p]
+            while q != sentinel:
+                if ignore[q] < dimIndex:
+                    ignore[q] = 0
+                q = prevDim[q]
+            q = prevDim[p]
+            while length > 1 and (cargoDim[q] > bounds[dimIndex] or cargoDim[prevDim[q]] >= bounds[dimIndex]):
+                p = q
+                remove(p, dimIndex, bounds)
+                q = prevDim[p]
+                length -= 1
+            qPrevDimIndex = prevDim[q]
+            if length > 1:
+                hvol = volumeDim[qPrevDimIndex] + areaDim[qPrevDimIndex] * (cargoDim[q] - cargoDim[qPrevDimIndex])
+            else:
+                areas[0][q] = 1
+                # the areas are computed from the previous values, as in hvRecursive
+                oldAreas = [areas[i][q] for i in range(dimIndex)]
+                for i in range(dimIndex):
+                    areas[i + 1][q] = oldAreas[i] * -cargo[i][q]
+            volumeDim[q] = hvol
+            if ignore[q] >= dimIndex:
+                areaDim[q] = areaDim[qPrevDimIndex]
+            else:
+                areaDim[q] = hvRecursive(dimIndex - 1, length, bounds)
+                if areaDim[q] <= areaDim[qPrevDimIndex]:
+                    ignore[q] = dimIndex
+            while p != sentinel:
+                pCargoDimIndex = cargoDim[p]
+                hvol += areaDim[q] * (pCargoDimIndex - cargoDim[q])
+                bounds[dimIndex] = pCargoDimIndex
+                reinsert(p, dimIndex, bounds)
+                length += 1
+                q = p
+                p = nextDim[p]
+                volumeDim[q] = hvol
+                if ignore[q] >= dimIndex:
+                    areaDim[q] = areaDim[prevDim[q]]
+                else:
+                    areaDim[q] = hvRecursive(dimIndex - 1, length, bounds)
+                    if areaDim[q] <= areaDim[prevDim[q]]:
+                        ignore[q] = dimIndex
+            hvol -= areaDim[q] * cargoDim[q]
+            return hvol
+
+
     def preProcess(self, front):
         """Sets up the list data structure needed for calculation."""
         dimensions = len(self.referencePoint)
@@ -169,6 +537,149 @@ class HyperVolume:
             
             
             
+class MonteCarloHyperVolume:
+    """
+    Monte Carlo estimation of the hypervolume, for fronts with too many
+    objectives for the exact algorithm.
+
+    Points are sampled uniformly in the box spanned by the front and the
+    reference point, in batches of batchSize, and the fraction dominated by
+    the front is measured. Sampling stops as soon as the half width of the
+    confidence interval drops below relativeError times the estimate, when
+    timeBudget seconds have passed or after maxSamples samples.
+
+    Minimization is implicitly assumed here!
+
+    """
+
+    def __init__(self, referencePoint, relativeError=0.01, timeBudget=None, confidence=0.95,
+                 batchSize=10000, chunkSize=nondominated.DEFAULT_CHUNK_SIZE, maxSamples=10**8, seed=None):
+        """Constructor."""
+        self.referencePoint = referencePoint
+        self.relativeError = relativeError
+        self.timeBudget = timeBudget
+        self.confidence = confidence
+        self.batchSize = batchSize
+        self.chunkSize = chunkSize
+        self.maxSamples = maxSamples
+        self.random = np.random.default_rng(seed)
+
+
+    def estimate(self, front):
+        """Returns a HyperVolumeEstimate of the hypervolume dominated by front."""
+        (points, lower, upper) = self.samplingBox([front])
+        if not self.dominatesVolume(points[0], upper):
+            return HyperVolumeEstimate(0.0, 0.0, 0.0, 0)
+        boxVolume = float(np.prod(upper - lower))
+        z = NormalDist().inv_cdf(0.5 + self.confidence / 2.0)
+        hits = 0
+        samples = 0
+        start = time.time()
+        while True:
+            hits += int(self.sampleBatch(points[0], lower, upper).sum())
+            samples += self.batchSize
+            p = hits / float(samples)
+            value = boxVolume * p
+            halfWidth = z * boxVolume * sqrt(p * (1.0 - p) / samples)
+            if self.finished(value, halfWidth, samples, start):
+                return HyperVolumeEstimate(value, max(value - halfWidth, 0.0), value + halfWidth, samples)
+
+
+    def estimateRelative(self, front, referenceFront):
+        """Returns a HyperVolumeEstimate of the quotient between the
+        hypervolume of front and the one of referenceFront.
+
+        Both fronts are tested against the same samples, so the confidence
+        interval of the quotient (delta method) is much narrower than the one
+        obtained by estimating both hypervolumes separately.
+
+        """
+        (points, lower, upper) = self.samplingBox([front, referenceFront])
+        if not self.dominatesVolume(points[1], upper):
+            raise Exception("ERROR: the hypervolume of the reference front is 0")
+        if not self.dominatesVolume(points[0], upper):
+            return HyperVolumeEstimate(0.0, 0.0, 0.0, 0)
+        z = NormalDist().inv_cdf(0.5 + self.confidence / 2.0)
+        hitsFront = 0
+        hitsReference = 0
+        hitsBoth = 0
+        samples = 0
+        start = time.time()
+        while True:
+            (frontHits, referenceHits) = self.sampleBatch(points, lower, upper)
+            hitsFront += int(frontHits.sum())
+            hitsReference += int(referenceHits.sum())
+            hitsBoth += int((frontHits & referenceHits).sum())
+            samples += self.batchSize
+            if hitsReference == 0:
+                if self.outOfBudget(samples, start):
+                    raise Exception("ERROR: no sample hit the reference front after {0} samples, its hypervolume is too small to estimate".format(samples))
+                continue
+            value = hitsFront / float(hitsReference)
+            meanReference = hitsReference / float(samples)
+            # variance of frontHit - value * referenceHit over the samples
+            variance = (hitsFront - 2.0 * value * hitsBoth + value * value * hitsReference) / float(samples)
+            halfWidth = z * sqrt(max(variance, 0.0) / samples) / meanReference
+            if self.finished(value, halfWidth, samples, start):
+                return HyperVolumeEstimate(value, max(value - halfWidth, 0.0), value + halfWidth, samples)
+
+
+    def samplingBox(self, fronts):
+        """Returns the points of each front that dominate the reference point
+        (None when there are none) and the box that encloses all of them and
+        the reference point.
+
+        """
+        upper = np.asarray(self.referencePoint, dtype=np.float64)
+        lower = upper.copy()
+        points = []
+        for front in fronts:
+            front = np.asarray(front, dtype=np.float64).reshape(-1, len(upper))
+            front = front[np.all(front <= upper, axis=1)]
+            if len(front) == 0:
+                points.append(None)
+            else:
+                lower = np.minimum(lower, front.min(axis=0))
+                points.append(front)
+        return (points, lower, upper)
+
+
+    def dominatesVolume(self, points, upper):
+        """Tells whether the points (None for none) dominate a box of positive
+        volume, that is, whether some point is strictly better than the
+        reference point in every objective.
+
+        """
+        return points is not None and bool(np.any(np.all(points < upper, axis=1)))
+
+
+    def sampleBatch(self, fronts, lower, upper):
+        """Draws batchSize samples in the box and returns, for a single front
+        or for each front of a list, which samples it dominates.
+
+        """
+        samples = self.random.uniform(lower, upper, size=(self.batchSize, len(upper)))
+        if isinstance(fronts, list):
+            return [nondominated.dominated_by(samples, front, self.chunkSize) for front in fronts]
+        return nondominated.dominated_by(samples, fronts, self.chunkSize)
+
+
+    def finished(self, value, halfWidth, samples, start):
+        """Tells whether the sampling can stop."""
+        if value > 0 and halfWidth <= self.relativeError * value:
+            return True
+        return self.outOfBudget(samples, start)
+
+
+    def outOfBudget(self, samples, start):
+        """Tells whether the time budget or the maximum number of samples
+        has been spent."""
+        if self.timeBudget != None and time.time() - start >= self.timeBudget:
+            return True
+        return samples >= self.maxSamples
+
+
+
 class MultiList: 
     """A special data structure needed by FonsecaHyperVolume. 
     
@@ -286,6 +797,85 @@ class MultiList:
             
 
 
+class ArrayMultiList:
+    """Index-based version of MultiList.
+
+    Node i is the i-th point and node n, one past the last point, is the
+    sentinel. Instead of one object per node holding four Python lists, every
+    list keeps its links in a flat list of node indices (all of them
+    references to the same n + 1 int objects) and its coordinates in a flat
+    list of floats, while areas and volumes live in float arrays. Nodes cost a
+    few machine words per list and there is nothing for the garbage collector
+    to track.
+
+    """
+
+    def __init__(self, numberLists, points):
+        """Constructor.
+
+        Builds 'numberLists' doubly linked lists over the (n, numberLists)
+        array points, the i-th one sorted by the i-th coordinate.
+
+        """
+        size = len(points) + 1
+        nodes = list(range(size))
+        self.numberLists = numberLists
+        self.sentinel = nodes[-1]
+        self.cargo = [points[:, i].tolist() + [0.0] for i in range(numberLists)]
+        self.next = []
+        self.prev = []
+        order = np.arange(len(points))
+        for i in range(numberLists):
+            # every list is a stable sort of the previous one, as in
+            # HyperVolume.preProcess, so that ties are broken the same way
+            order = order[np.argsort(points[order, i], kind="stable")]
+            chain = [self.sentinel] + [nodes[j] for j in order.tolist()] + [self.sentinel]
+            nextLinks = [self.sentinel] * size
+            prevLinks = [self.sentinel] * size
+            for j in range(size):
+                nextLinks[chain[j]] = chain[j + 1]
+                prevLinks[chain[j + 1]] = chain[j]
+            self.next.append(nextLinks)
+            self.prev.append(prevLinks)
+        self.ignore = [0] * size
+        self.area = [array("d", bytes(8 * size)) for _ in range(numberLists)]
+        self.volume = [array("d", bytes(8 * size)) for _ in range(numberLists)]
+
+
+    def __len__(self):
+        """Returns the number of lists that are included in this ArrayMultiList."""
+        return self.numberLists
+
+
+    def remove(self, node, index, bounds):
+        """Removes and returns 'node' from all lists in [0, 'index'[."""
+        for i in range(index):
+            nextLinks = self.next[i]
+            prevLinks = self.prev[i]
+            predecessor = prevLinks[node]
+            successor = nextLinks[node]
+            nextLinks[predecessor] = successor
+            prevLinks[successor] = predecessor
+            if bounds[i] > self.cargo[i][node]:
+                bounds[i] = self.cargo[i][node]
+        return node
+
+
+    def reinsert(self, node, index, bounds):
+        """
+        Inserts 'node' at the position it had in all lists in [0, 'index'[
+        before it was removed. This method assumes that the next and previous
+        nodes of the node that is reinserted are in the list.
+
+        """
+        for i in range(index):
+            self.next[i][self.prev[i][node]] = node
+            self.prev[i][self.next[i][node]] = node
+            if bounds[i] > self.cargo[i][node]:
+                bounds[i] = self.cargo[i][node]
+
+
+
 if __name__ == "__main__":
 
     # Example:
@@ -15,67 +15,101 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import sys
+from functools import cached_property
 from math import sqrt
 
 import numpy as np
+
+import nondominated
 from hv import HyperVolume
 
+def kd_tree(points):
+    """
+    Returns the KD-tree of the (n, m) array points. SciPy is only imported
+    when the first tree is built, so the code that does not measure distances
+    starts without it.
+    """
+    from scipy.spatial import cKDTree
+    return cKDTree(points)
+
+def front_bounds(PF):
+    """
+    Returns (minimum, maximum): the arrays of the minimum and maximum value of
+    every objective in PF (a FrontIndex or the coordinates of a front).
+    """
+    if isinstance(PF, FrontIndex):
+        return PF.bounds
+    minimum = np.array([np.min(values) for values in PF], dtype=np.float64)
+    maximum = np.array([np.max(values) for values in PF], dtype=np.float64)
+    return (minimum, maximum)
+
 def normalize_front(refFront, approxFront):
     """
     This function normalizes the approximated Pareto front (approxFront)
     in the range [0,1] using the reference Pareto front (refFront).
     """
-    minX = refFront[0][0]
-    maxX = refFront[0][0]
-    minY = refFront[1][0]
-    maxY = refFront[1][0]
+    (minimum, maximum) = front_bounds(refFront)
+    return tuple((np.asarray(approxFront[j], dtype=np.float64) - minimum[j]) / (maximum[j] - minimum[j])
+                 for j in range(len(minimum)))
     
-    for i in range(len(refFront[0])):
-        if minX > refFront[0][i]:
-            minX = refFront[0][i]
-        if maxX < refFront[0][i]:
-            maxX = refFront[0][i]
+def pareto_frontier_array(points, maxX = False, maxY = False):
+    """
+    Computes the Pareto frontier of an (n, 2) array of points.
+
+    The points are sorted lexicographically once (in descending order of X if
+    maxX is set), a point is kept when its Y value is not worse than the best Y
+    seen so far (running minimum, or maximum if maxY is set) and repeated
+    points are dropped. Returns (indices, front), where indices are the rows of
+    points that form the frontier, in the order they appear in front.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise Exception("ERROR: points must be an (n, 2) array")
+    if len(points) == 0:
+        return (np.empty(0, dtype=np.intp), np.empty((0, 2)))
 
-        if minY > refFront[1][i]:
-            minY = refFront[1][i]
-        if maxY < refFront[1][i]:
-            maxY = refFront[1][i]
+    xs = -points[:, 0] if maxX else points[:, 0]
+    ys = -points[:, 1] if maxX else points[:, 1]
+    order = np.lexsort((ys, xs))
 
-    normApproxFrontX = []
-    normApproxFrontY = []
+    sorted_ys = points[order, 1]
+    if maxY:
+        sorted_ys = -sorted_ys
+    best_so_far = np.empty_like(sorted_ys)
+    best_so_far[0] = np.inf
+    np.minimum.accumulate(sorted_ys[:-1], out=best_so_far[1:])
+    indices = order[sorted_ys <= best_so_far]
 
-    for i in range(len(approxFront[0])):
-        normApproxFrontX.append((approxFront[0][i] - minX) / (maxX - minX))
-        normApproxFrontY.append((approxFront[1][i] - minY) / (maxY - minY))
+    #Borro los elementos repetidos del frente
+    front = points[indices]
+    repeated = np.zeros(len(front), dtype=bool)
+    repeated[1:] = np.all(front[1:] == front[:-1], axis=1)
+    indices = indices[~repeated]
 
-    return (normApproxFrontX, normApproxFrontY)
-    
-def pareto_frontier(Xs, Ys, maxX = False, maxY = False):
-    # Sort the list in either ascending or descending order of X
-    myList = sorted([[Xs[i], Ys[i]] for i in range(len(Xs))], reverse=maxX)
-    # Start the Pareto frontier with the first value in the sorted list
-    p_front = [myList[0]]
-    # Loop through the sorted list
-    for pair in myList[1:]:
-        if maxY:
-            if pair[1] >= p_front[-1][1]:
-                p_front.append(pair)
-        else:
-            if pair[1] <= p_front[-1][1]:
-                p_front.append(pair)
+    return (indices, points[indices])
 
-    p_frontX = [pair[0] for pair in p_front]
-    p_frontY = [pair[1] for pair in p_front]
+def pareto_frontier(Xs, Ys, maxX = False, maxY = False):
+    (_, front) = pareto_frontier_array(np.column_stack((Xs, Ys)), maxX, maxY)
+    return (front[:, 0], front[:, 1])
 
-    #Borro los elementos repetidos del frente
-    copia_pfX=list(p_frontX)
-    copia_pfY=list(p_frontY)
-    for i,(a,b) in enumerate(zip(copia_pfX[1:],copia_pfY[1:])):
-        if (a==copia_pfX[i] and b==copia_pfY[i]):
-            p_frontX.remove(a)
-            p_frontY.remove(b)   
+def non_dominated_points(points):
+    """
+    Returns the non-dominated set of the (n, m) array of points, sorted.
+    """
+    if points.shape[1] == 2:
+        (_, front) = pareto_frontier_array(points)
+    else:
+        (_, front) = nondominated.nondominated(points)
+    return front
 
-    return (p_frontX, p_frontY)
+def non_dominated_union(fronts):
+    """
+    Returns the non-dominated set of the union of an iterable of (n, m)
+    arrays. Every array is reduced to its own non-dominated set as soon as it
+    is produced, so only the survivors are ever concatenated. The result is
+    the same as reducing the concatenation of all the arrays.
+    """
+    return non_dominated_points(np.concatenate([non_dominated_points(front) for front in fronts]))
 
 def euclidean_distance(x1,y1,x2,y2):
     return (sqrt((x1-x2)*(x1-x2) + (y1-y2)*(y1-y2)))
@@ -91,13 +125,129 @@ def distance_to_front(x,y,PF):
     return min_distance
 
 
-def generational_distance(X,Y,PF):
+class FrontIndex:
+    """
+    Reference front shared by the metrics of every run: its points, the
+    minimum and maximum of every objective and a KD-tree of the points. PF
+    holds the coordinates of the front, PF[j] being the values of objective
+    j, as in the rest of this module. Everything is computed the first time
+    it is needed.
+    """
+
+    def __init__(self, PF):
+        self.points = np.column_stack([np.asarray(values, dtype=np.float64) for values in PF])
+
+    @cached_property
+    def tree(self):
+        return kd_tree(self.points)
+
+    @cached_property
+    def bounds(self):
+        return (self.points.min(axis=0), self.points.max(axis=0))
+
+    @cached_property
+    def extremes(self):
+        """
+        The points of the front with the minimum value of every objective.
+        """
+        return self.points[np.argmin(self.points, axis=0)]
+
+    def distances(self, points, p=2):
+        """
+        Returns the distance from every row of the (n, m) array points to its
+        closest point of the front, using the Minkowski p-norm (p=2 is the
+        euclidean distance).
+        """
+        (distances, _) = self.tree.query(np.asarray(points, dtype=np.float64), k=1, p=p)
+        return distances
+
+def front_index(PF):
+    """
+    Returns PF itself when it already is a FrontIndex, otherwise an index of
+    it.
+    """
+    if isinstance(PF, FrontIndex):
+        return PF
+    return FrontIndex(PF)
+
+class FrontContext:
+    """
+    Front of one run together with the intermediate results that several
+    metrics need, so that every run is normalized, sorted and indexed only
+    once. points is the (n, m) array of the front; when bounds (as returned
+    by front_bounds) are given, the metrics see the front normalized with
+    them and raw_points keeps the original values. Everything else is
+    computed the first time it is needed.
+    """
+
+    def __init__(self, points, bounds=None):
+        self.raw_points = np.asarray(points, dtype=np.float64)
+        if bounds != None:
+            (minimum, maximum) = bounds
+            self.points = (self.raw_points - minimum) / (maximum - minimum)
+        else:
+            self.points = self.raw_points
+
+    def __len__(self):
+        return len(self.points)
+
+    @cached_property
+    def order(self):
+        """
+        Indices that sort the points lexicographically.
+        """
+        return np.lexsort(self.points.T[::-1])
+
+    @cached_property
+    def sorted_points(self):
+        return self.points[self.order]
+
+    @cached_property
+    def extremes(self):
+        """
+        The first and the last point in lexicographic order.
+        """
+        return (self.sorted_points[0], self.sorted_points[-1])
+
+    @cached_property
+    def tree(self):
+        return kd_tree(self.points)
+
+    @cached_property
+    def neighbor_distances(self):
+        """
+        Manhattan distance from every point to the closest other point.
+        """
+        return nearest_neighbor_distances(self.points, p=1, tree=self.tree)
+
+def front_context(X, Y=None):
+    """
+    Returns X itself when it already is a FrontContext, otherwise a context
+    of the front with coordinates (X, Y), or of the (n, m) array X when Y is
+    not given.
+    """
+    if isinstance(X, FrontContext):
+        return X
+    if Y is None:
+        return FrontContext(X)
     if (len(X)!=len(Y)):
         raise Exception("ERROR: X and Y must have the same length")
-    number_of_points=len(X)
+    return FrontContext(np.column_stack((X, Y)))
+
+def generational_distance(X,Y,PF,p=2):
+    """
+    Square root of the sum of the distances from every point to the closest
+    point of PF (a FrontIndex or the coordinates of the front), divided by the
+    number of points. The distances use the Minkowski p-norm. X can also be
+    the FrontContext of the front, with Y set to None.
+    """
+    context=front_context(X,Y)
+    number_of_points=len(context)
+    distances=front_index(PF).distances(context.points, p)
     total_distance=0
-    for i in range(0,number_of_points):
-        total_distance+=distance_to_front(X[i],Y[i],PF)
+    # added in order so the result matches the distance by distance sum
+    for d in distances.tolist():
+        total_distance+=d
     return sqrt(total_distance)/float(number_of_points)
 
 def distance_to_closest_neighbor_spacing(x,y,X,Y):
@@ -110,42 +260,121 @@ def distance_to_closest_neighbor_spacing(x,y,X,Y):
             min_distance=distance
     return min_distance
 
-def spacing (X,Y):
-    if (len(X)!=len(Y)):
-        raise Exception("ERROR: X and Y must have the same length")
+def nearest_neighbor_distances(points, p=1, tree=None):
+    """
+    Returns the distance from every row of the (n, m) array points to the
+    closest other row, using the Minkowski p-norm (p=1 is the Manhattan
+    distance used by spacing). All the distances come from a single query of
+    a KD-tree of points (tree, when already built): the closest row to every
+    point is itself, so the second closest is its neighbour (at distance 0
+    when the point is repeated).
+    """
+    if len(points) < 2:
+        raise Exception("ERROR: at least two points are needed to find neighbours")
+    if tree is None:
+        tree = kd_tree(points)
+    (distances, _) = tree.query(points, k=2, p=p)
+    return distances[:, 1]
+
+def spacing (X,Y=None):
+    context=front_context(X,Y)
 
-    #XY = sorted([[X[i], Y[i]] for i in range(len(X))], reverse=False)
-    XY = [[X[i], Y[i]] for i in range(len(X))]
-        
-    number_of_points=len(X)
-    list_of_distances=[]
-    for i in range(0,len(X)):
-        list_of_distances.append(distance_to_closest_neighbor_spacing(XY[i][0],XY[i][1], [a[0] for a in XY[:i]+XY[i+1:]], [b[1] for b in XY[:i]+XY[i+1:]]))
-        
-    average_distance=np.mean(np.array(list_of_distances))
+    number_of_points=len(context)
+    list_of_distances=context.neighbor_distances
+
+    average_distance=np.mean(list_of_distances)
     sum=0
-    for d in list_of_distances:
+    for d in list_of_distances.tolist():
         sum+=((d-average_distance)*(d-average_distance))
     return sqrt(sum/float(number_of_points))
 
 def spread(X,Y,PF):
-    if (len(X)!=len(Y)):
-        raise Exception("ERROR: X and Y must have the same length")
-
-    XY = sorted([[X[i], Y[i]] for i in range(len(X))], reverse=False)
+    context=front_context(X,Y)
+    XY = context.sorted_points
 
-    number_of_points=len(X)
-    list_of_distances=[]
-    for i in range(1,len(X)-1):
-        list_of_distances.append(euclidean_distance(XY[i][0],XY[i][1],XY[i+1][0],XY[i+1][1]))
-    average_distance=np.mean(np.array(list_of_distances))
+    number_of_points=len(context)
+    gaps=XY[2:]-XY[1:-1]
+    list_of_distances=np.sqrt((gaps*gaps).sum(axis=1))
+    average_distance=np.mean(list_of_distances)
     suma=0
-    for d in list_of_distances:
+    for d in list_of_distances.tolist():
         suma+=abs(d-average_distance)
 
-    argmin_objective_0=np.argmin(np.array(PF[0]))
-    argmin_objective_1=np.argmin(np.array(PF[1]))
-    distance_to_pf_extreme_0=euclidean_distance(PF[0][argmin_objective_0], PF[1][argmin_objective_0], XY[0][0],XY[0][1])
-    distance_to_pf_extreme_1=euclidean_distance(PF[0][argmin_objective_1], PF[1][argmin_objective_1], XY[-1][0],XY[-1][1])
+    (pf_extreme_0, pf_extreme_1) = front_index(PF).extremes[:2]
+    (first, last) = context.extremes
+    distance_to_pf_extreme_0=euclidean_distance(pf_extreme_0[0], pf_extreme_0[1], first[0], first[1])
+    distance_to_pf_extreme_1=euclidean_distance(pf_extreme_1[0], pf_extreme_1[1], last[0], last[1])
     spread = (distance_to_pf_extreme_0 + distance_to_pf_extreme_1 + suma)/float(distance_to_pf_extreme_0+distance_to_pf_extreme_1+(number_of_points*average_distance))
     return spread
+
+# Bytes that the point to point matrices of the indicators below may take at
+# once. The reference front is processed in blocks that fit in this budget.
+DEFAULT_MAX_MEMORY = 64 * 1024 * 1024
+
+def _reference_blocks(front, reference, max_memory):
+    """
+    Splits the rows of reference in blocks such that a (block, len(front),
+    m) float64 matrix, and a temporary copy of it, fit in max_memory bytes.
+    """
+    (n, m) = front.shape
+    rows = max(1, max_memory // (2 * 8 * max(n, 1) * m))
+    for start in range(0, len(reference), rows):
+        yield reference[start:start + rows]
+
+def inverted_generational_distance(front, PF, p=2):
+    """
+    Average distance from every point of the reference front PF (a FrontIndex
+    or the coordinates of the front) to the closest point of front, an (n, m)
+    array or its FrontContext. The distances use the Minkowski p-norm and come
+    from the KD-tree of front.
+    """
+    reference = front_index(PF).points
+    (distances, _) = front_context(front).tree.query(reference, k=1, p=p)
+    return float(np.mean(distances))
+
+def inverted_generational_distance_plus(front, PF, max_memory=DEFAULT_MAX_MEMORY):
+    """
+    IGD+ of Ishibuchi et al. (minimization): average over the points z of the
+    reference front PF of the distance to the closest point a of front, where
+    only the objectives in which a is worse than z count:
+        d+(z, a) = sqrt(sum_j max(a_j - z_j, 0)^2)
+    """
+    front = front_context(front).points
+    reference = front_index(PF).points
+    total = 0.0
+    for block in _reference_blocks(front, reference, max_memory):
+        worse = np.maximum(front[np.newaxis, :, :] - block[:, np.newaxis, :], 0)
+        total += np.sqrt(np.einsum("ijk,ijk->ij", worse, worse)).min(axis=1).sum()
+    return total / len(reference)
+
+def additive_epsilon(front, PF, max_memory=DEFAULT_MAX_MEMORY):
+    """
+    Additive epsilon indicator (minimization): the smallest value that has to
+    be subtracted from every objective of the points of front so that every
+    point of the reference front PF is weakly dominated.
+    """
+    front = front_context(front).points
+    reference = front_index(PF).points
+    epsilon = -np.inf
+    for block in _reference_blocks(front, reference, max_memory):
+        shifts = (front[np.newaxis, :, :] - block[:, np.newaxis, :]).max(axis=2)
+        epsilon = max(epsilon, shifts.min(axis=1).max())
+    return float(epsilon)
+
+def multiplicative_epsilon(front, PF, max_memory=DEFAULT_MAX_MEMORY):
+    """
+    Multiplicative epsilon indicator (minimization): the smallest factor by
+    which every objective of the points of front has to be divided so that
+    every point of the reference front PF is weakly dominated. It is only
+    defined for positive objective values, so it should be computed on the
+    values before normalization, which are the raw_points of a FrontContext.
+    """
+    front = front_context(front).raw_points
+    reference = front_index(PF).points
+    if (front <= 0).any() or (reference <= 0).any():
+        raise Exception("ERROR: the multiplicative epsilon indicator needs positive objective values")
+    epsilon = 0.0
+    for block in _reference_blocks(front, reference, max_memory):
+        factors = (front[np.newaxis, :, :] / block[:, np.newaxis, :]).max(axis=2)
+        epsilon = max(epsilon, factors.min(axis=1).max())
+    return float(epsilon)
@@ -0,0 +1,204 @@
+# Copyright 2015 Renzo Massobrio
+# Facultad de Ingenieria, UdelaR
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Machine-readable results of generic_pf_metrics.compute.
+
+A MetricsResult holds the value of every metric for every run and the
+statistics over the runs, and writes them as JSON, CSV, NPZ or a text table
+(tabulatelib), so the results of many jobs can be collected without parsing
+the printed report.
+"""
+
+import csv
+import json
+import sys
+
+import numpy as np
+
+import tabulatelib
+
+# (key, title, maximize) of every metric, in the order of the values of
+# generic_pf_metrics.evaluate_run. The best value is the maximum for the
+# metrics with maximize set, the minimum otherwise.
+METRICS = [
+    ("gd", "Generational Distance", False),
+    ("spacing", "Spacing", False),
+    ("spread", "Spread", False),
+    ("relative_hv", "Relative hypervolume", True),
+    ("igd", "Inverted Generational Distance", False),
+    ("igd_plus", "Inverted Generational Distance plus", False),
+    ("eps_add", "Additive epsilon", False),
+    ("eps_mult", "Multiplicative epsilon", False),
+]
+
+# Statistics of every metric over the runs
+STATISTICS = ["best", "mean", "median", "std", "shapiro_w", "shapiro_p"]
+
+OUTPUT_FORMATS = ["json", "csv", "npz", "table"]
+
+def summary_statistics(values, maximize=False):
+    """
+    Returns the STATISTICS of the values of a metric over the runs as a
+    dictionary, or None when the metric is not defined for some run (nan).
+    """
+    values = np.array(values)
+    if np.isnan(values).any():
+        return None
+    # SciPy is only loaded when the statistics are computed
+    from scipy import stats
+    (w, p_value) = stats.shapiro(values)
+    return {
+        "best": np.max(values) if maximize else np.min(values),
+        "mean": np.mean(values),
+        "median": np.median(values),
+        "std": np.std(values),
+        "shapiro_w": w,
+        "shapiro_p": p_value,
+    }
+
+class MetricsResult:
+    """
+    Results of a comparison: values maps every key of METRICS to the array
+    of its values for every run, hv_ideal and reference_point are the ones
+    of the global front and plot_path the path of the plot of all the runs
+    (None when it was not drawn).
+    """
+
+    def __init__(self, values, normalize, hv_ideal, reference_point, plot_path=None):
+        self.values = dict((key, np.asarray(values[key], dtype=np.float64)) for (key, _, _) in METRICS)
+        self.normalize = normalize
+        self.hv_ideal = hv_ideal
+        self.reference_point = reference_point
+        self.plot_path = plot_path
+        self._summary = None
+
+    @property
+    def number_of_runs(self):
+        return len(self.values[METRICS[0][0]])
+
+    def summary(self):
+        """
+        Returns a dictionary with the summary_statistics of every metric.
+        """
+        if self._summary == None:
+            self._summary = dict((key, summary_statistics(self.values[key], maximize)) for (key, _, maximize) in METRICS)
+        return self._summary
+
+    def to_dict(self):
+        """
+        Returns the result as plain lists, numbers and None (for the values
+        that are not defined), ready for json.
+        """
+        summary = {}
+        for (key, statistics) in self.summary().items():
+            summary[key] = None if statistics == None else dict((name, _number(value)) for (name, value) in statistics.items())
+        return {
+            "runs": self.number_of_runs,
+            "normalize": bool(self.normalize),
+            "hv_ideal": _number(self.hv_ideal),
+            "reference_point": [_number(value) for value in self.reference_point],
+            "plot": self.plot_path,
+            "metrics": dict((key, [_number(value) for value in self.values[key]]) for (key, _, _) in METRICS),
+            "summary": summary,
+        }
+
+    def write_json(self, f):
+        json.dump(self.to_dict(), f, indent=1)
+        f.write("\n")
+
+    def write_csv(self, f):
+        """
+        Writes one row per run, with the run number in the first column,
+        followed by one row per statistic, named in the first column.
+        """
+        writer = csv.writer(f)
+        writer.writerow(["run"] + [key for (key, _, _) in METRICS])
+        for run in range(self.number_of_runs):
+            writer.writerow([run] + [repr(float(self.values[key][run])) for (key, _, _) in METRICS])
+        summary = self.summary()
+        for name in STATISTICS:
+            writer.writerow([name] + ["" if summary[key] == None else repr(float(summary[key][name])) for (key, _, _) in METRICS])
+
+    def write_npz(self, f):
+        """
+        Writes the array of every metric under its key, the statistics as
+        summary_<statistic> arrays in the order of the metrics array (nan for
+        the metrics that are not defined) and the global front values.
+        """
+        summary = self.summary()
+        arrays = dict(self.values)
+        for name in STATISTICS:
+            arrays["summary_" + name] = np.array([np.nan if summary[key] == None else summary[key][name] for (key, _, _) in METRICS])
+        np.savez(f, metrics=np.array([key for (key, _, _) in METRICS]), normalize=np.array(bool(self.normalize)),
+                 hv_ideal=np.array(self.hv_ideal, dtype=np.float64), reference_point=np.array(self.reference_point, dtype=np.float64),
+                 **arrays)
+
+    def table(self, tablefmt="simple"):
+        """
+        Returns the statistics of every metric as a tabulatelib table.
+        """
+        rows = []
+        summary = self.summary()
+        for (key, title, maximize) in METRICS:
+            if summary[key] == None:
+                rows.append([title, "max" if maximize else "min"] + [None] * len(STATISTICS))
+            else:
+                rows.append([title, "max" if maximize else "min"] + [summary[key][name] for name in STATISTICS])
+        return tabulatelib.tabulate(rows, headers=["Metric", "Best is"] + STATISTICS, tablefmt=tablefmt, missingval="-")
+
+    def write(self, path_to_file, output_format=None):
+        """
+        Writes the result to path_to_file (or to the standard output when it
+        is "-") in output_format, one of OUTPUT_FORMATS. By default the
+        format is the extension of the file, or the table.
+        """
+        if output_format == None:
+            extension = path_to_file.rsplit(".", 1)[-1].lower() if "." in path_to_file else ""
+            output_format = extension if extension in OUTPUT_FORMATS else "table"
+        if output_format not in OUTPUT_FORMATS:
+            raise Exception("ERROR: unknown output format {0}, it must be one of {1}".format(output_format, ", ".join(OUTPUT_FORMATS)))
+
+        if output_format == "npz":
+            if path_to_file == "-":
+                np_file = sys.stdout.buffer
+                self.write_npz(np_file)
+                np_file.flush()
+            else:
+                with open(path_to_file, "wb") as f:
+                    self.write_npz(f)
+            return
+
+        if path_to_file == "-":
+            self._write_text(sys.stdout, output_format)
+        else:
+            with open(path_to_file, "w", newline="" if output_format == "csv" else None) as f:
+                self._write_text(f, output_format)
+
+    def _write_text(self, f, output_format):
+        if output_format == "json":
+            self.write_json(f)
+        elif output_format == "csv":
+            self.write_csv(f)
+        else:
+            f.write(self.table() + "\n")
+
+def _number(value):
+    """
+    Returns value as a float, or None when it is nan (JSON has no nan).
+    """
+    value = float(value)
+    return None if np.isnan(value) else value
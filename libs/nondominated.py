@@ -0,0 +1,199 @@
+# Copyright 2015 Renzo Massobrio
+# Facultad de Ingenieria, UdelaR
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Non-dominated filtering for any number of objectives (minimization).
+
+Points are handled as (n, m) arrays. Every filter sorts the points
+lexicographically first: after that sort a point can only be weakly dominated
+by points that come before it, which is what all the sweeps below rely on.
+"""
+
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+# Number of points compared against each other at once when testing dominance
+# with NumPy broadcasting. Memory use is bounded by chunk_size^2 * m booleans.
+DEFAULT_CHUNK_SIZE = 1024
+
+# Kung's recursion stops splitting at blocks of this many points.
+KUNG_LEAF_SIZE = 128
+
+def lexicographic_order(points):
+    """
+    Returns the indices that sort points lexicographically (first objective
+    first).
+    """
+    return np.lexsort(points.T[::-1])
+
+def nondominated(points, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Computes the non-dominated set of an (n, m) array of points.
+
+    Weakly dominated points are discarded, so only one copy of each repeated
+    point is kept. Returns (indices, front), where indices are the rows of
+    points that form the front and front is sorted lexicographically.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim != 2:
+        raise Exception("ERROR: points must be an (n, m) array")
+    (n, m) = points.shape
+    if n == 0:
+        return (np.empty(0, dtype=np.intp), points.copy())
+
+    order = lexicographic_order(points)
+    if m == 1:
+        indices = order[:1]
+    elif m == 2:
+        indices = order[_sweep_2d(points[order])]
+    elif m == 3:
+        indices = order[_sweep_3d(points[order])]
+    else:
+        indices = order[_kung(points[order], chunk_size)]
+
+    return (indices, points[indices])
+
+def merge(front, points, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Updates a front with new points.
+
+    front must be a non-dominated set sorted lexicographically, as returned
+    by nondominated. Returns the non-dominated set of the union of front and
+    points, equal to nondominated(np.concatenate((front, points)))[1], but
+    only the new points are filtered from scratch: they are reduced to their
+    own front, merged into the sorted front and then both sets are filtered
+    against each other.
+    """
+    (_, points) = nondominated(points, chunk_size)
+    if len(front) == 0:
+        return points
+    if len(points) == 0:
+        return front
+
+    m = front.shape[1]
+    if m <= 2:
+        merged = _merge_sorted(front, points)
+        if m == 1:
+            return merged[:1]
+        return merged[_sweep_2d(merged)]
+
+    # new points equal to a point of front are dropped here, so the copy in
+    # front survives the second filter
+    points = points[~dominated_by(points, front, chunk_size)]
+    front = front[~dominated_by(front, points, chunk_size)]
+    return _merge_sorted(front, points)
+
+def dominated_by(points, front, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Returns a boolean mask telling which rows of points are weakly dominated
+    by at least one row of front. Both arrays are compared in blocks of
+    chunk_size rows so that memory stays bounded.
+    """
+    mask = np.zeros(len(points), dtype=bool)
+    if len(front) == 0:
+        return mask
+    for start in range(0, len(points), chunk_size):
+        block = points[start:start + chunk_size]
+        block_mask = mask[start:start + chunk_size]
+        for f_start in range(0, len(front), chunk_size):
+            pending = np.flatnonzero(~block_mask)
+            if len(pending) == 0:
+                break
+            hits = _weak_dominance_matrix(front[f_start:f_start + chunk_size], block[pending]).any(axis=0)
+            block_mask[pending[hits]] = True
+    return mask
+
+def _merge_sorted(a, b):
+    """
+    Merges two lexicographically sorted arrays. The stable sort behind
+    lexsort detects the two sorted runs, so this costs about a linear pass.
+    """
+    merged = np.concatenate((a, b))
+    return merged[lexicographic_order(merged)]
+
+def _weak_dominance_matrix(points, others):
+    """
+    Returns the (len(points), len(others)) boolean matrix telling whether each
+    row of points weakly dominates each row of others. Objectives are compared
+    one at a time, which is much faster than reducing a 3-D broadcast.
+    """
+    matrix = np.less_equal.outer(points[:, 0], others[:, 0])
+    for j in range(1, points.shape[1]):
+        matrix &= np.less_equal.outer(points[:, j], others[:, j])
+    return matrix
+
+def _sweep_2d(points):
+    """
+    Non-dominated rows of a lexicographically sorted (n, 2) array: a point is
+    kept when its second objective strictly improves the running minimum.
+    """
+    best_so_far = np.empty(len(points))
+    best_so_far[0] = np.inf
+    np.minimum.accumulate(points[:-1, 1], out=best_so_far[1:])
+    return np.flatnonzero(points[:, 1] < best_so_far)
+
+def _sweep_3d(points):
+    """
+    Non-dominated rows of a lexicographically sorted (n, 3) array.
+
+    Sweeps along the first objective keeping the 2-D staircase of the points
+    accepted so far (second objective ascending, third descending). A point
+    is dominated when the staircase step to its left is not above it.
+    """
+    stair_y = []
+    stair_z = []
+    kept = []
+    for (i, (_, y, z)) in enumerate(points.tolist()):
+        k = bisect_right(stair_y, y)
+        if k > 0 and stair_z[k - 1] <= z:
+            continue
+        # drop the steps the new point dominates
+        start = bisect_left(stair_y, y)
+        end = start
+        while end < len(stair_y) and stair_z[end] >= z:
+            end += 1
+        stair_y[start:end] = [y]
+        stair_z[start:end] = [z]
+        kept.append(i)
+    return np.array(kept, dtype=np.intp)
+
+def _block_filter(points):
+    """
+    Non-dominated rows of a small lexicographically sorted block, tested all
+    against all with a single broadcast.
+    """
+    weakly_dominates = _weak_dominance_matrix(points, points)
+    # only earlier points can dominate later ones
+    weakly_dominates &= np.tri(len(points), k=-1, dtype=bool).T
+    return np.flatnonzero(~weakly_dominates.any(axis=0))
+
+def _kung(points, chunk_size):
+    """
+    Kung's divide-and-conquer filter on a lexicographically sorted array.
+
+    The sorted points are split in halves, both halves are filtered
+    recursively and the survivors of the second half that are dominated by the
+    survivors of the first half are removed. Blocks of at most KUNG_LEAF_SIZE
+    points are filtered directly.
+    """
+    if len(points) <= min(chunk_size, KUNG_LEAF_SIZE):
+        return _block_filter(points)
+    middle = len(points) // 2
+    top = _kung(points[:middle], chunk_size)
+    bottom = _kung(points[middle:], chunk_size) + middle
+    bottom = bottom[~dominated_by(points[bottom], points[top], chunk_size)]
+    return np.concatenate((top, bottom))
@@ -0,0 +1,180 @@
+# Copyright 2015 Renzo Massobrio
+# Facultad de Ingenieria, UdelaR
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Per-stage timing and memory instrumentation of the metrics pipeline.
+
+The code marks its stages with
+
+    with profiling.stage("name", run):
+        ...
+
+which does nothing until a Profiler is enabled. Then every stage records its
+wall time, its CPU time and, when memory tracing is on, the peak of the
+memory allocated while it ran (measured with tracemalloc, relative to the
+memory in use when the stage started). Stages can be nested: the peak of a
+stage includes the peaks of the stages inside it. Worker processes enable
+their own Profiler and hand their records to the parent with add().
+"""
+
+import contextlib
+import cProfile
+import json
+import sys
+import time
+import tracemalloc
+
+import tabulatelib
+
+class Profiler:
+    """
+    Collects one record per executed stage: its name, the run it belongs to
+    (or None), the wall and CPU seconds and the peak memory in MB (None
+    without memory tracing).
+    """
+
+    def __init__(self, trace_memory=True, cprofile=False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self.cprofile = cProfile.Profile() if cprofile else None
+        self._stack = []
+        self._started_tracing = False
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.cprofile != None:
+            self.cprofile.enable()
+
+    def stop(self):
+        if self.cprofile != None:
+            self.cprofile.disable()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextlib.contextmanager
+    def stage(self, name, run=None):
+        entry = {"start": 0, "peak": 0}
+        if self.trace_memory:
+            (current, peak) = tracemalloc.get_traced_memory()
+            # the peak so far belongs to the enclosing stage
+            if len(self._stack) > 0:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+            entry = {"start": current, "peak": current}
+        self._stack.append(entry)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            self._stack.pop()
+            peak_mb = None
+            if self.trace_memory:
+                peak = max(entry["peak"], tracemalloc.get_traced_memory()[1])
+                peak_mb = (peak - entry["start"]) / 1e6
+                if len(self._stack) > 0:
+                    self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            self.records.append({"stage": name, "run": run, "wall": wall, "cpu": cpu, "peak_mb": peak_mb})
+
+    def add(self, records):
+        """
+        Adds the records of another Profiler, e.g. the one of a worker.
+        """
+        self.records.extend(records)
+
+    def take(self):
+        """
+        Returns the records collected so far and forgets them.
+        """
+        (records, self.records) = (self.records, [])
+        return records
+
+    def summary(self):
+        """
+        Returns one row per stage, in the order the stages first ran: the
+        stage, the number of times it ran, the total wall and CPU seconds,
+        the longest wall time of a single call and the largest peak memory.
+        """
+        rows = {}
+        for record in self.records:
+            if record["stage"] not in rows:
+                rows[record["stage"]] = [record["stage"], 0, 0.0, 0.0, 0.0, None]
+            row = rows[record["stage"]]
+            row[1] += 1
+            row[2] += record["wall"]
+            row[3] += record["cpu"]
+            row[4] = max(row[4], record["wall"])
+            if record["peak_mb"] != None:
+                row[5] = record["peak_mb"] if row[5] == None else max(row[5], record["peak_mb"])
+        return list(rows.values())
+
+    def print_summary(self, f=None):
+        """
+        Prints the summary table to f, the standard output by default.
+        """
+        f = sys.stdout if f == None else f
+        print("", file=f)
+        print("########################", file=f)
+        print("Profile", file=f)
+        print("########################", file=f)
+        print(tabulatelib.tabulate(self.summary(), headers=["stage", "calls", "wall (s)", "cpu (s)", "max wall (s)", "max peak (MB)"],
+                                   floatfmt=".4f", missingval="-"), file=f)
+
+    def dump_json(self, path_to_file):
+        with open(path_to_file, "w") as f:
+            json.dump({"trace_memory": self.trace_memory, "records": self.records}, f, indent=1)
+
+    def dump_cprofile(self, path_to_file):
+        self.cprofile.dump_stats(path_to_file)
+
+# The Profiler the stages record to, None when profiling is off
+_profiler = None
+
+def enable(trace_memory=True, cprofile=False):
+    """
+    Starts recording the stages in a new Profiler and returns it.
+    """
+    global _profiler
+    _profiler = Profiler(trace_memory, cprofile)
+    _profiler.start()
+    return _profiler
+
+def disable():
+    """
+    Stops recording the stages and returns the Profiler that recorded them.
+    """
+    global _profiler
+    profiler = _profiler
+    _profiler = None
+    if profiler != None:
+        profiler.stop()
+    return profiler
+
+def active():
+    return _profiler
+
+def stage(name, run=None):
+    """
+    Context manager that records the stage in the active Profiler, if any.
+    """
+    if _profiler == None:
+        return contextlib.nullcontext()
+    return _profiler.stage(name, run)
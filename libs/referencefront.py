@@ -0,0 +1,171 @@
+# Copyright 2015 Renzo Massobrio
+# Facultad de Ingenieria, UdelaR
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+The global (reference) Pareto front that the runs are compared against,
+and a cache of it keyed by its content.
+
+Setting up the reference means filtering the candidate points, finding the
+normalization bounds, the reference point of the hypervolume and the
+hypervolume of the front itself. A ReferenceCache keeps those results in an
+.npz file named after a hash of the candidate points and the normalize mode,
+so comparing more results against the same reference skips all that work.
+"""
+
+import glob
+import hashlib
+import os
+import re
+import tempfile
+from os import path
+
+import numpy as np
+
+import metricslib
+import profiling
+from hv import HyperVolume
+
+# Name of a cache entry, after the content_key of the front
+ENTRY_PATTERN = re.compile(r"reference\.[0-9a-f]{64}\.npz")
+
+class ReferenceFront:
+    """
+    Global front of a comparison: points is the sorted (n, m) array of the
+    filtered front, bounds the (minimum, maximum) of every objective,
+    reference_point the point used for the hypervolumes and hv_ideal the
+    hypervolume of the front, both in normalized values when normalize is
+    set.
+    """
+
+    def __init__(self, points, bounds, reference_point, hv_ideal, normalize):
+        self.points = points
+        self.bounds = bounds
+        self.reference_point = reference_point
+        self.hv_ideal = hv_ideal
+        self.normalize = normalize
+
+    @property
+    def raw_global_pf(self):
+        """
+        The coordinates of the front, as the metrics of metricslib take them.
+        """
+        return tuple(self.points[:, j] for j in range(self.points.shape[1]))
+
+    @property
+    def global_pf(self):
+        """
+        The coordinates of the front, normalized when normalize is set.
+        """
+        if not self.normalize:
+            return self.raw_global_pf
+        (minimum, maximum) = self.bounds
+        return tuple((self.points[:, j] - minimum[j]) / (maximum[j] - minimum[j]) for j in range(self.points.shape[1]))
+
+def compute(fronts, normalize):
+    """
+    Builds the ReferenceFront of the union of a list of (n, m) arrays.
+    """
+    with profiling.stage("reference.pareto_frontier"):
+        points = metricslib.non_dominated_union(fronts)
+    bounds = (points.min(axis=0), points.max(axis=0))
+    reference = ReferenceFront(points, bounds, None, None, normalize)
+
+    #The reference point to calculate the hypervolume is the projection of the global PF ends
+    global_pf = reference.global_pf
+    reference.reference_point = [max(np.array(values)) for values in global_pf]
+    with profiling.stage("reference.hypervolume"):
+        hyperVolume = HyperVolume(reference.reference_point)
+        reference.hv_ideal = hyperVolume.compute(np.column_stack(global_pf))
+    return reference
+
+def content_key(fronts, normalize):
+    """
+    Hash of the values of a list of (n, m) arrays and the normalize mode.
+    The number of objectives is hashed once and then the rows of all the
+    arrays in order, so the split of the points in arrays does not change
+    the key.
+    """
+    digest = hashlib.sha256("normalize={0};".format(bool(normalize)).encode("utf-8"))
+    digest.update("{0};".format(fronts[0].shape[1] if len(fronts) > 0 else 0).encode("utf-8"))
+    for front in fronts:
+        front = np.ascontiguousarray(front, dtype=np.float64)
+        digest.update(memoryview(front).cast("B"))
+    return digest.hexdigest()
+
+class ReferenceCache:
+    """
+    Folder of cached ReferenceFront files, named after their content_key.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def entry(self, key):
+        return path.join(self.directory, "reference.{0}.npz".format(key))
+
+    def clear(self):
+        """
+        Removes the cached ReferenceFront files, and nothing else in the
+        folder.
+        """
+        for entry in glob.glob(path.join(glob.escape(self.directory), "reference.*.npz")):
+            if ENTRY_PATTERN.fullmatch(path.basename(entry)):
+                try:
+                    os.remove(entry)
+                except OSError:
+                    pass
+
+    def load(self, key, normalize):
+        """
+        Returns the cached ReferenceFront of key, or None when there is none.
+        """
+        entry = self.entry(key)
+        if not path.exists(entry):
+            return None
+        try:
+            with np.load(entry) as data:
+                return ReferenceFront(data["points"], (data["minimum"], data["maximum"]),
+                                      data["reference_point"].tolist(), float(data["hv_ideal"]), normalize)
+        except (OSError, ValueError, KeyError):
+            # a damaged entry is computed again
+            return None
+
+    def save(self, key, reference):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            (handle, temporary) = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(handle, "wb") as f:
+                np.savez(f, points=reference.points, minimum=reference.bounds[0], maximum=reference.bounds[1],
+                         reference_point=np.array(reference.reference_point, dtype=np.float64),
+                         hv_ideal=np.array(reference.hv_ideal))
+            os.replace(temporary, self.entry(key))
+        except OSError:
+            # the cache is only an optimization, e.g. the folder may be read-only
+            pass
+
+def load_or_compute(fronts, normalize, cache=None):
+    """
+    Returns the ReferenceFront of a list of (n, m) arrays, from cache (a
+    ReferenceCache) when it holds it, otherwise computing and caching it.
+    """
+    if cache == None:
+        return compute(fronts, normalize)
+    key = content_key(fronts, normalize)
+    reference = cache.load(key, normalize)
+    if reference == None:
+        reference = compute(fronts, normalize)
+        cache.save(key, reference)
+    return reference
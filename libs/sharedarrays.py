@@ -0,0 +1,82 @@
+# Copyright 2015 Renzo Massobrio
+# Facultad de Ingenieria, UdelaR
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Named NumPy arrays packed in a single shared memory block, so that worker
+processes can read them without pickling the data for every task.
+
+The parent process creates a SharedArrays and hands its (small, picklable)
+spec to its worker processes, which call attach(spec) to get read-only views
+of the same memory. Only the parent removes the block.
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Every array starts at a multiple of this many bytes.
+ALIGNMENT = 64
+
+class SharedArrays:
+    """
+    Copies a dictionary of arrays into one shared memory block.
+    """
+
+    def __init__(self, arrays):
+        layout = []
+        size = 0
+        for (name, value) in arrays.items():
+            value = np.ascontiguousarray(value)
+            layout.append((name, value.dtype.str, value.shape, size))
+            size += -(-value.nbytes // ALIGNMENT) * ALIGNMENT
+        self.memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.spec = (self.memory.name, layout)
+        self.arrays = _views(self.memory, layout)
+        for (name, value) in arrays.items():
+            self.arrays[name][...] = value
+
+    def close(self):
+        """
+        Releases and removes the shared memory block.
+        """
+        self.arrays = None
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def attach(spec):
+    """
+    Returns (memory, arrays): the shared memory block described by spec and a
+    dictionary of read-only views of its arrays. The caller must keep memory
+    alive as long as it uses the arrays.
+    """
+    (name, layout) = spec
+    memory = shared_memory.SharedMemory(name=name)
+    arrays = _views(memory, layout)
+    for value in arrays.values():
+        value.flags.writeable = False
+    return (memory, arrays)
+
+def _views(memory, layout):
+    arrays = {}
+    for (name, dtype, shape, offset) in layout:
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=memory.buf, offset=offset)
+    return arrays
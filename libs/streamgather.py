@@ -0,0 +1,192 @@
+# Copyright 2015 Renzo Massobrio
+# Facultad de Ingenieria, UdelaR
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Aggregation of the fronts of many result files within a memory budget.
+
+The files are parsed in chunks and every chunk is reduced to its own front.
+The reduced chunks are buffered and, when the buffer outgrows the budget,
+reduced again and spilled to a temporary file, sorted lexicographically.
+At the end the spilled fronts are merged in sorted order (k-way merge) and
+filtered as a stream: after the sort a point can only be dominated by points
+that come before it.
+
+The result is the same that pf_gather computes in memory: the frontier of
+metricslib.pareto_frontier_array for two objectives and the non-dominated
+set of nondominated.nondominated otherwise. For two objectives the final
+filter only keeps the best value seen so far; for more objectives it keeps
+the part of the front already produced, so memory is bounded by the budget
+plus the size of the aggregated front.
+"""
+
+import heapq
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import frontio
+import metricslib
+import nondominated
+
+# Approximate memory used for every value of a chunk while it is parsed and
+# reduced (line text, parsed values, sort keys and copies)
+BYTES_PER_VALUE = 64
+
+def chunk_rows(max_memory, num_objectives):
+    """
+    Number of points handled at once to stay within max_memory bytes.
+    """
+    return max(1, max_memory // (BYTES_PER_VALUE * num_objectives))
+
+def reduce_points(points):
+    """
+    Returns the front of an (n, m) array of points, sorted, with the same
+    semantics as pf_gather.
+    """
+    if points.shape[1] == 2:
+        (_, front) = metricslib.pareto_frontier_array(points)
+    else:
+        (_, front) = nondominated.nondominated(points)
+    return front
+
+def gather(paths_to_files, num_objectives, max_memory):
+    """
+    Computes the aggregated front of paths_to_files using about max_memory
+    bytes. Yields the front in sorted blocks of points.
+    """
+    rows = chunk_rows(max_memory, num_objectives)
+    directory = tempfile.mkdtemp(prefix="pf_gather.")
+    try:
+        spills = []
+        buffer = []
+        buffered = 0
+        for path_to_file in paths_to_files:
+            for chunk in frontio.read_front_chunks(path_to_file, num_objectives, rows):
+                front = reduce_points(chunk)
+                buffer.append(front)
+                buffered += len(front)
+                if buffered > rows:
+                    front = reduce_points(np.concatenate(buffer))
+                    (buffer, buffered) = ([front], len(front))
+                    if buffered > rows // 2:
+                        spills.append(_spill(directory, len(spills), front))
+                        (buffer, buffered) = ([], 0)
+
+        if len(buffer) > 0:
+            front = reduce_points(np.concatenate(buffer))
+        else:
+            front = np.empty((0, num_objectives))
+        if len(spills) == 0:
+            # everything fit in the budget
+            if len(front) > 0:
+                yield front
+            return
+        if len(front) > 0:
+            spills.append(_spill(directory, len(spills), front))
+
+        for block in _merge(spills, num_objectives, rows):
+            yield block
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def _spill(directory, number, front):
+    path_to_file = os.path.join(directory, "front.{0}.npy".format(number))
+    np.save(path_to_file, front)
+    return path_to_file
+
+def _read_sorted(path_to_file, block_rows):
+    """
+    Yields the points of a spilled front as tuples, reading block_rows
+    points at a time.
+    """
+    front = np.load(path_to_file, mmap_mode="r")
+    for start in range(0, len(front), block_rows):
+        for point in front[start:start + block_rows].tolist():
+            yield tuple(point)
+
+def _merge(spills, num_objectives, rows):
+    """
+    k-way merge of the spilled fronts followed by the streaming filter.
+    Yields the surviving points in blocks.
+    """
+    block_rows = max(1, rows // (len(spills) + 1))
+    if num_objectives == 2:
+        stream_filter = _FrontierFilter()
+    else:
+        stream_filter = _ArchiveFilter()
+
+    pending = []
+    for point in heapq.merge(*[_read_sorted(spill, block_rows) for spill in spills]):
+        pending.append(point)
+        if len(pending) == block_rows:
+            block = stream_filter.filter(np.array(pending))
+            pending = []
+            if len(block) > 0:
+                yield block
+    if len(pending) > 0:
+        block = stream_filter.filter(np.array(pending))
+        if len(block) > 0:
+            yield block
+
+class _FrontierFilter:
+    """
+    Streaming version of metricslib.pareto_frontier_array for points that
+    arrive sorted lexicographically, one block at a time.
+    """
+
+    def __init__(self):
+        self.best = np.inf
+        self.last = None
+
+    def filter(self, block):
+        ys = block[:, 1]
+        best_so_far = np.empty(len(block))
+        best_so_far[0] = self.best
+        np.minimum.accumulate(ys[:-1], out=best_so_far[1:])
+        np.minimum(best_so_far[1:], self.best, out=best_so_far[1:])
+        keep = ys <= best_so_far
+
+        # equal points are next to each other in the stream
+        repeated = np.zeros(len(block), dtype=bool)
+        repeated[1:] = np.all(block[1:] == block[:-1], axis=1)
+        if self.last is not None:
+            repeated[0] = np.array_equal(block[0], self.last)
+        keep &= ~repeated
+
+        self.best = min(self.best, ys.min())
+        self.last = block[-1].copy()
+        return block[keep]
+
+class _ArchiveFilter:
+    """
+    Streaming version of nondominated.nondominated for points that arrive
+    sorted lexicographically, one block at a time. The accepted points are
+    kept to test the next blocks against them.
+    """
+
+    def __init__(self):
+        self.archive = None
+
+    def filter(self, block):
+        (_, block) = nondominated.nondominated(block)
+        if self.archive is None:
+            self.archive = block
+        else:
+            block = block[~nondominated.dominated_by(block, self.archive)]
+            self.archive = np.concatenate((self.archive, block))
+        return block